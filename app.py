@@ -1,41 +1,94 @@
 import os
 import logging
-import requests
 import sys
-import importlib.util
-from flask import Flask
-from config import *
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import importlib.metadata
+
+USAGE = """Usage: python app.py [--skip-checks] [--help] [--version]
+
+Starts the CDA-to-FHIR Converter web server on http://localhost:5000
+
+  --skip-checks  Skip the dependency check and AWS warm-up
+                 (same as setting APP_SKIP_STARTUP_CHECKS=1)
+  --help         Show this message and exit
+  --version      Show the application version and exit
+
+Set FLASK_DEBUG=1 to enable debug mode and the auto-reloader."""
+
+# Answer --help/--version before the Flask, AWS and route imports below
+if __name__ == '__main__':
+    if '--help' in sys.argv[1:]:
+        print(USAGE)
+        sys.exit(0)
+    if '--version' in sys.argv[1:]:
+        from config import APP_VERSION
+        print(f"MedFlowX CDA-to-FHIR Converter {APP_VERSION}")
+        sys.exit(0)
+
+from flask import Flask, request
+from utils.json_provider import OrjsonProvider
+from config import (
+    LOG_LEVEL, SUPPRESS_BOTO_DEBUG, UPLOAD_FOLDER, MAX_CONTENT_LENGTH, SECRET_KEY, VERBOSE_STATUS
+)
 
 # Configure logging
 logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    level=LOG_LEVEL,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    # An explicit datefmt skips the per-record millisecond formatting
+    datefmt='%Y-%m-%d %H:%M:%S'
 )
 
 logger = logging.getLogger(__name__)
 
-# Suppress boto debug messages
+# Third-party loggers quieted when SUPPRESS_BOTO_DEBUG is set
+NOISY_LOGGERS = ('boto3', 'botocore', 'urllib3')
+
+# Suppress boto debug messages. A logger level (unlike a handler filter) is
+# checked before a record is created, so suppressed calls stay cheap; child
+# loggers such as botocore.endpoint inherit it
 if SUPPRESS_BOTO_DEBUG:
-    logging.getLogger('boto3').setLevel(logging.WARNING)
-    logging.getLogger('botocore').setLevel(logging.WARNING)
-    logging.getLogger('urllib3').setLevel(logging.WARNING)
+    for noisy_logger in NOISY_LOGGERS:
+        logging.getLogger(noisy_logger).setLevel(logging.WARNING)
+
+# Separator line for the startup banner
+BANNER_SEPARATOR = "=" * 80
+
+# Packages verified by check_dependencies() at startup
+REQUIRED_PACKAGES = frozenset({
+    'flask', 'requests', 'boto3', 'google.generativeai',
+    'xmltodict', 'jinja2', 'werkzeug', 'orjson'
+})
+
+def _installed_distributions():
+    """Return normalized names of all installed distributions from one metadata scan"""
+    installed = set()
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata['Name']
+        if name:
+            installed.add(name.lower().replace('-', '_').replace('.', '_'))
+    return installed
 
 def check_dependencies():
     """Check if all required dependencies are installed"""
-    required_packages = [
-        'flask', 'requests', 'boto3', 'google.generativeai', 
-        'xmltodict', 'jinja2', 'werkzeug'
-    ]
-    
+    installed = None
     missing_packages = []
     
-    for package in required_packages:
-        try:
-            importlib.import_module(package)
-            logger.info(f"✅ {package} is available")
-        except ImportError:
-            missing_packages.append(package)
-            logger.warning(f"❌ {package} is missing")
+    for package in sorted(REQUIRED_PACKAGES):
+        # Packages that are already imported need no further lookup; the
+        # metadata scan only runs if something has not been loaded yet
+        if package not in sys.modules:
+            if installed is None:
+                installed = _installed_distributions()
+            # Distribution names use '-' where import paths use '.' (google-generativeai)
+            if package.replace('.', '_') not in installed:
+                missing_packages.append(package)
+                continue
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"✅ {package} is available")
+    
+    logger.info("Checked %d dependencies, %d missing", len(REQUIRED_PACKAGES), len(missing_packages))
     
     if missing_packages:
         logger.error(f"Missing packages: {', '.join(missing_packages)}")
@@ -48,8 +101,8 @@ def check_dependencies():
 def check_aws_configuration():
     """Check AWS configuration"""
     try:
-        import boto3
-        sts = boto3.client('sts')
+        from utils.aws_service import get_boto3_client
+        sts = get_boto3_client('sts')
         identity = sts.get_caller_identity()
         logger.info(f"✅ AWS configured successfully! Account: {identity['Account']}")
         return True
@@ -59,18 +112,15 @@ def check_aws_configuration():
         return False
 
 def check_upload_directory():
-    """Check if upload directory exists"""
-    if os.path.exists(UPLOAD_FOLDER):
-        logger.info(f"Upload directory exists: {UPLOAD_FOLDER}")
+    """Ensure the upload directory exists"""
+    try:
+        # exist_ok makes this a single syscall when the directory is already there
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+        logger.info(f"Upload directory ready: {UPLOAD_FOLDER}")
         return True
-    else:
-        try:
-            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-            logger.info(f"Created upload directory: {UPLOAD_FOLDER}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to create upload directory: {e}")
-            return False
+    except OSError as e:
+        logger.error(f"Failed to create upload directory: {e}")
+        return False
 
 def initialize_aws_service():
     """Initialize AWS service"""
@@ -86,62 +136,103 @@ def initialize_aws_service():
         logger.error(f"Failed to initialize AWS service: {e}")
         return False
 
-# Set AWS credentials from config
-os.environ['AWS_ACCESS_KEY_ID'] = AWS_ACCESS_KEY_ID
-os.environ['AWS_SECRET_ACCESS_KEY'] = AWS_SECRET_ACCESS_KEY
-os.environ['AWS_DEFAULT_REGION'] = AWS_REGION
+# AWS setup is deferred until the first request so startup stays fast
+_aws_initialized = threading.Event()
+_aws_init_lock = threading.Lock()
 
-# Create the app
-app = Flask(__name__)
-app.secret_key = SECRET_KEY
+def ensure_aws_initialized():
+    """Run the AWS configuration check and service init once, on first use"""
+    if _aws_initialized.is_set():
+        return
+    with _aws_init_lock:
+        if _aws_initialized.is_set():
+            return
+        logger.info("Initializing AWS healthcare service...")
+        if not check_aws_configuration():
+            logger.info("AWS not configured - basic features only")
+        initialize_aws_service()
+        _aws_initialized.set()
 
-# Configure upload settings
-app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+def initialize_aws_on_first_request():
+    """Pay the AWS initialization cost on the first non-static request"""
+    if request.endpoint != 'static':
+        ensure_aws_initialized()
 
-# Create upload directory if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+def create_app():
+    """Create and configure the Flask application"""
+    flask_app = Flask(__name__)
+    flask_app.json = OrjsonProvider(flask_app)
+    flask_app.secret_key = SECRET_KEY
+    
+    # Configure upload settings
+    flask_app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+    flask_app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    flask_app.config['VERBOSE_STATUS'] = VERBOSE_STATUS
+    
+    flask_app.before_request(initialize_aws_on_first_request)
+    return flask_app
 
-# Import routes
+# Create the app
+app = create_app()
+
+# Create upload directory if it doesn't exist (also needed when served without main())
+upload_directory_ready = check_upload_directory()
+
+# Import routes - they register on the module-level app, which is also the
+# WSGI entrypoint used by the Vercel deployment
 from routes import *
 
 def main():
     """Main startup function"""
-    logger.info("Starting CDA-to-FHIR Converter with Advanced AWS Integration")
-    logger.info("=" * 80)
+    logger.info("\n".join([
+        "Starting CDA-to-FHIR Converter with Advanced AWS Integration",
+        BANNER_SEPARATOR
+    ]))
+    
+    # Debug mode (and the reloader) is opt-in via FLASK_DEBUG=1
+    debug = os.environ.get('FLASK_DEBUG', '0') == '1'
+    
+    # The reloader child re-runs main(); the parent has already checked dependencies
+    is_reloader_child = os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    
+    # Readiness probes can take over the checks in containers
+    skip_checks = '--skip-checks' in sys.argv[1:] or bool(os.environ.get('APP_SKIP_STARTUP_CHECKS'))
+    
+    # Run as a script this module is __main__, while routes.py registers on the
+    # app created by importing `app`; use that module's app and AWS state
+    import app as app_module
+    
+    # Warm up AWS (an STS round-trip) in the background while the local checks
+    # run; the first request waits on the same lock if it is not finished yet.
+    # The reloader parent only watches files, so it skips the warm-up.
+    startup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aws-warmup')
+    if not skip_checks and (not debug or is_reloader_child):
+        startup_executor.submit(app_module.ensure_aws_initialized)
+    startup_executor.shutdown(wait=False)
     
     # Check dependencies
-    if not check_dependencies():
+    if not skip_checks and not is_reloader_child and not check_dependencies():
         logger.error("Dependency check failed. Please install missing packages.")
         sys.exit(1)
     
-    # Check AWS configuration
-    aws_configured = check_aws_configuration()
-    
     # Check upload directory
-    if not check_upload_directory():
+    if not upload_directory_ready:
         logger.error("Upload directory check failed.")
         sys.exit(1)
     
-    # Initialize AWS service
-    logger.info("Initializing AWS healthcare service...")
-    initialize_aws_service()
-    
     # Start Flask application
-    logger.info("Starting Flask web server...")
-    logger.info("=" * 80)
-    
     try:
-        logger.info("Application started successfully!")
-        logger.info(f"Web Interface: http://localhost:5000")
-        logger.info(f"Dashboard: http://localhost:5000/dashboard")
-        logger.info(f"Features: http://localhost:5000/features")
-        logger.info("=" * 80)
-        
-        if not aws_configured:
-            logger.info("AWS not configured - basic features only")
+        logger.info("\n".join([
+            "Starting Flask web server...",
+            BANNER_SEPARATOR,
+            "Application started successfully!",
+            "Web Interface: http://localhost:5000",
+            "Dashboard: http://localhost:5000/dashboard",
+            "Features: http://localhost:5000/features",
+            BANNER_SEPARATOR
+        ]))
         
-        app.run(host='0.0.0.0', port=5000, debug=True)
+        app_module.app.run(host='0.0.0.0', port=5000, debug=debug, use_reloader=debug)
         
     except KeyboardInterrupt:
         logger.info("Application stopped by user")
@@ -1,3 +1,8 @@
+import logging
+import os
+
+APP_VERSION = '1.0'
+
 # AWS Configuration
 # Set your AWS credentials here or use environment variables for security
 AWS_ACCESS_KEY_ID = ''  # e.g., 'AKIA...'
@@ -7,14 +12,18 @@ AWS_REGION = 'us-east-1'  # e.g., 'us-east-1'
 # Flask Configuration
 SECRET_KEY = ''  # Set a strong secret key for Flask sessions
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-UPLOAD_FOLDER = 'uploads'
+# Resolved once against the project directory so it does not depend on the CWD
+UPLOAD_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), 'uploads'))
+
+# Include step-by-step progress detail in upload status_updates (set VERBOSE_STATUS=1 for demos)
+VERBOSE_STATUS = os.environ.get('VERBOSE_STATUS', '0') == '1'
 
 # Ultravox API Configuration
 ULTRAVOX_API_KEY = ''  # e.g., 'your-ultravox-api-key'
 ULTRAVOX_API_URL = 'https://api.ultravox.ai/api'
 
 # Logging Configuration
-LOG_LEVEL = 'INFO'
+LOG_LEVEL = logging.INFO
 SUPPRESS_BOTO_DEBUG = True
 
 # Default voice for Cynthia (Joanna)
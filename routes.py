@@ -1,8 +1,15 @@
 import os
 import json
+import asyncio
 import uuid
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import threading
+from collections import Counter, OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
 from flask import render_template, request, jsonify, flash, redirect, url_for
 from werkzeug.utils import secure_filename
@@ -12,17 +19,32 @@ from utils.cda_processor import CDAProcessor
 from utils.fhir_converter import FHIRConverter
 from utils.aws_service import aws_service
 from utils.mongodb_store import mongodb_store
-import copy
 
 # Global MongoDB store instance
 data_store = mongodb_store
 import random
 
 # Allowed file extensions
-ALLOWED_EXTENSIONS = {'xml', 'cda', 'png', 'jpg', 'jpeg', 'gif', 'pdf', 'txt'}
+ALLOWED_EXTENSIONS = frozenset({'xml', 'cda', 'png', 'jpg', 'jpeg', 'gif', 'pdf', 'txt'})
+
+# Scalar fields of an empty patient record; list fields are added fresh per record
+PATIENT_DATA_FIELDS = (
+    'patient_id', 'name', 'gender', 'birth_date', 'address', 'phone', 'medical_record_number'
+)
+
+def empty_patient_data():
+    """Return a new patient_data dict with every field unset"""
+    patient_data = dict.fromkeys(PATIENT_DATA_FIELDS)
+    patient_data['medical_conditions'] = []
+    patient_data['medications'] = []
+    patient_data['phi_detected'] = []
+    return patient_data
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    """Return the lower-cased extension if it is allowed, otherwise None"""
+    _, dot, ext = filename.rpartition('.')
+    ext = ext.lower()
+    return ext if dot and ext in ALLOWED_EXTENSIONS else None
 
 @app.route('/')
 def upload():
@@ -39,153 +61,178 @@ def features():
     """Features and USP page showing unique advantages"""
     return render_template('features.html')
 
+# Results of the one-time AWS infrastructure setup steps. Only successful
+# results are kept, so a failed step is retried by the next upload
+_aws_bootstrap_results = {}
+_aws_bootstrap_locks = {
+    step: threading.Lock() for step in ('api_gateway', 'cloudwatch', 'secrets_manager', 'api_keys')
+}
+
+def run_aws_bootstrap_step(step, setup, *args):
+    """Run an idempotent AWS setup step once and reuse its successful result"""
+    result = _aws_bootstrap_results.get(step)
+    if result is not None:
+        return result
+    with _aws_bootstrap_locks[step]:
+        result = _aws_bootstrap_results.get(step)
+        if result is None:
+            result = setup(*args)
+            if result.get('success'):
+                _aws_bootstrap_results[step] = result
+    return result
+
+def reset_aws_bootstrap():
+    """Forget cached setup results so the next upload recreates the resources"""
+    _aws_bootstrap_results.clear()
+
+def setup_api_gateway():
+    """Create the API Gateway infrastructure on first use"""
+    return run_aws_bootstrap_step('api_gateway', aws_service.create_api_gateway_infrastructure)
+
+def setup_cloudwatch_alarms():
+    """Create the CloudWatch alarms on first use"""
+    return run_aws_bootstrap_step('cloudwatch', aws_service.create_cloudwatch_alarms)
+
+def status_update(step, status):
+    """Build a status update entry; the timestamp is formatted when the record is stored"""
+    return {'step': step, 'status': status, 'timestamp': time.time()}
+
+def append_detail_status(status_updates, step, status):
+    """Append a progress-detail status update when VERBOSE_STATUS is enabled"""
+    if app.config.get('VERBOSE_STATUS'):
+        status_updates.append(status_update(step, status))
+
+def format_status_timestamp(timestamp):
+    """Return a status update timestamp as an ISO string"""
+    if isinstance(timestamp, float):
+        return datetime.fromtimestamp(timestamp).isoformat()
+    return timestamp
+
+def finalize_status_updates(status_updates):
+    """Format raw status update timestamps as ISO strings, in place"""
+    for update in status_updates:
+        update['timestamp'] = format_status_timestamp(update['timestamp'])
+    return status_updates
+
+def setup_secrets_and_load_api_keys():
+    """Set up Secrets Manager, then load the API keys if setup succeeded"""
+    secrets_result = run_aws_bootstrap_step('secrets_manager', aws_service.create_secrets_manager_secrets)
+    api_keys_result = None
+    if secrets_result['success']:
+        api_keys_result = run_aws_bootstrap_step(
+            'api_keys', aws_service.get_secret_from_manager, 'healthcare-api-keys'
+        )
+    return secrets_result, api_keys_result
+
+# Workers for uploads submitted with "Prefer: respond-async"
+upload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='upload-worker')
+
+# Background uploads by id, as (future, response_data); oldest entries are dropped
+MAX_TRACKED_UPLOADS = 100
+_upload_jobs = OrderedDict()
+_upload_jobs_lock = threading.Lock()
+
+def track_upload_job(upload_id, future, response_data):
+    """Remember a background upload so its status can be polled"""
+    with _upload_jobs_lock:
+        _upload_jobs[upload_id] = (future, response_data)
+        while len(_upload_jobs) > MAX_TRACKED_UPLOADS:
+            _upload_jobs.popitem(last=False)
+
+def process_upload(process_mode, filepath, file_ext, response_data, start_time):
+    """Run the processing step and store the record; returns (response_data, status code)"""
+    try:
+        processing_result = process_mode(filepath, file_ext, response_data)
+        response_data.update(processing_result)
+        status_code = 200
+    except Exception as e:
+        app.logger.error("❌ Processing failed: %s", e)
+        response_data['success'] = False
+        response_data['error'] = str(e)
+        status_code = 500
+    
+    # Store the processing record once, with the final results. The store
+    # inserts a copy, so Mongo's ObjectId never reaches response_data and
+    # the record id comes back as a string
+    finalize_status_updates(response_data['status_updates'])
+    record_id = data_store.add_processing_record(response_data)
+    if record_id:
+        response_data['record_id'] = str(record_id)
+    
+    if status_code == 200:
+        # Calculate processing time
+        response_data['processing_time'] = round(time.time() - start_time, 2)
+        
+        # Log successful API Gateway invocation
+        aws_service.log_api_gateway_invocation('/api/upload', 'POST', 'COMPLETED')
+    
+    return response_data, status_code
+
 @app.route('/api/upload', methods=['POST'])
-def upload_file():
+async def upload_file():
     """UNIFIED UPLOAD ENDPOINT - Handles all processing modes with real-time status"""
+    # Blocking AWS/MongoDB calls below run via asyncio.to_thread so the
+    # worker is not held while they wait on the network
     start_time = time.time()
     
-    # Ensure patient_data is always present in response_data
-    response_data = {
-        'id': str(uuid.uuid4()),
-        'file_id': None,
-        'file_type': None,
-        'processing_mode': None,
-        'processing_timestamp': datetime.now().isoformat(),
-        'status_updates': [],
-        'aws_resources_created': False,
-        'cleanup_available': False,
-        'patient_data': {
-            'patient_id': None,
-            'name': None,
-            'gender': None,
-            'birth_date': None,
-            'address': None,
-            'phone': None,
-            'medical_record_number': None,
-            'medical_conditions': [],
-            'medications': [],
-            'phi_detected': []
-        },
-        'processing_time': 0,
-        'api_gateway_status': None,
-        's3_status': None,
-        'cloudwatch_status': None,
-        'secrets_manager_status': None,
-        'success': True
-    }
-    
     try:
         # Initialize status updates list early
         status_updates = []
         
         # API Gateway Integration - Create infrastructure if needed
-        app.logger.info("🔗 Initializing API Gateway integration...")
-        status_updates.append({
-            'step': 'API Gateway',
-            'status': '🔗 Initializing API Gateway integration...',
-            'timestamp': datetime.now().isoformat()
-        })
+        app.logger.debug("🔗 Initializing API Gateway integration...")
+        append_detail_status(status_updates, 'API Gateway', '🔗 Initializing API Gateway integration...')
         
-        api_gateway_result = aws_service.create_api_gateway_infrastructure()
+        # CloudWatch Alarms Integration - Set up monitoring
+        app.logger.debug("🚨 Setting up CloudWatch alarms for monitoring...")
+        append_detail_status(status_updates, 'CloudWatch', '🚨 Setting up CloudWatch alarms for monitoring...')
+        
+        # Secrets Manager Integration - Set up and load secrets
+        app.logger.debug("🔐 Setting up Secrets Manager and loading secrets...")
+        append_detail_status(status_updates, 'Secrets Manager', '🔐 Setting up Secrets Manager and loading secrets...')
+        
+        # The three setups are independent, so run them concurrently; the
+        # secret lookup is chained after its own setup in the same thread.
+        # Each step only calls AWS until it has succeeded once
+        api_gateway_result, cloudwatch_result, (secrets_result, api_keys_result) = await asyncio.gather(
+            asyncio.to_thread(setup_api_gateway),
+            asyncio.to_thread(setup_cloudwatch_alarms),
+            asyncio.to_thread(setup_secrets_and_load_api_keys)
+        )
         
         if api_gateway_result['success']:
-            app.logger.info(f"✅ API Gateway ready: {api_gateway_result['api_url']}")
-            status_updates.append({
-                'step': 'API Gateway',
-                'status': f'✅ Created API Gateway: {api_gateway_result["api_name"]} (ID: {api_gateway_result["api_id"]})',
-                'timestamp': datetime.now().isoformat()
-            })
-            status_updates.append({
-                'step': 'API Gateway',
-                'status': f'✅ API Gateway deployed successfully: {api_gateway_result["api_url"]}',
-                'timestamp': datetime.now().isoformat()
-            })
-            status_updates.append({
-                'step': 'API Gateway',
-                'status': f'✅ API Gateway ready: {api_gateway_result["api_url"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+            app.logger.info("✅ API Gateway ready: %s", api_gateway_result['api_url'])
+            append_detail_status(status_updates, 'API Gateway', f'✅ Created API Gateway: {api_gateway_result["api_name"]} (ID: {api_gateway_result["api_id"]})')
+            append_detail_status(status_updates, 'API Gateway', f'✅ API Gateway deployed successfully: {api_gateway_result["api_url"]}')
+            status_updates.append(status_update('API Gateway', f'✅ API Gateway ready: {api_gateway_result["api_url"]}'))
             # Log API Gateway invocation
-            aws_service.log_api_gateway_invocation('/api/upload', 'POST', 'INITIALIZED')
-            status_updates.append({
-                'step': 'API Gateway',
-                'status': '🔗 API Gateway: POST /api/upload - INITIALIZED',
-                'timestamp': datetime.now().isoformat()
-            })
+            await asyncio.to_thread(aws_service.log_api_gateway_invocation, '/api/upload', 'POST', 'INITIALIZED')
+            append_detail_status(status_updates, 'API Gateway', '🔗 API Gateway: POST /api/upload - INITIALIZED')
         else:
-            app.logger.warning(f"⚠️ API Gateway setup: {api_gateway_result['message']}")
-            status_updates.append({
-                'step': 'API Gateway',
-                'status': f'⚠️ API Gateway setup: {api_gateway_result["message"]}',
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        # CloudWatch Alarms Integration - Set up monitoring
-        app.logger.info("🚨 Setting up CloudWatch alarms for monitoring...")
-        status_updates.append({
-            'step': 'CloudWatch',
-            'status': '🚨 Setting up CloudWatch alarms for monitoring...',
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        cloudwatch_result = aws_service.create_cloudwatch_alarms()
+            app.logger.warning("⚠️ API Gateway setup: %s", api_gateway_result['message'])
+            status_updates.append(status_update('API Gateway', f'⚠️ API Gateway setup: {api_gateway_result["message"]}'))
         
         if cloudwatch_result['success']:
-            app.logger.info(f"✅ CloudWatch alarms created: {cloudwatch_result['message']}")
-            status_updates.append({
-                'step': 'CloudWatch',
-                'status': f'✅ CloudWatch alarms created: {cloudwatch_result["message"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+            app.logger.info("✅ CloudWatch alarms created: %s", cloudwatch_result['message'])
+            status_updates.append(status_update('CloudWatch', f'✅ CloudWatch alarms created: {cloudwatch_result["message"]}'))
         else:
-            app.logger.warning(f"⚠️ CloudWatch alarms setup: {cloudwatch_result['message']}")
-            status_updates.append({
-                'step': 'CloudWatch',
-                'status': f'⚠️ CloudWatch alarms setup: {cloudwatch_result["message"]}',
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        # Secrets Manager Integration - Set up and load secrets
-        app.logger.info("🔐 Setting up Secrets Manager and loading secrets...")
-        status_updates.append({
-            'step': 'Secrets Manager',
-            'status': '🔐 Setting up Secrets Manager and loading secrets...',
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        secrets_result = aws_service.create_secrets_manager_secrets()
+            app.logger.warning("⚠️ CloudWatch alarms setup: %s", cloudwatch_result['message'])
+            status_updates.append(status_update('CloudWatch', f'⚠️ CloudWatch alarms setup: {cloudwatch_result["message"]}'))
         
         if secrets_result['success']:
-            app.logger.info(f"✅ Secrets Manager setup: {secrets_result['message']}")
-            status_updates.append({
-                'step': 'Secrets Manager',
-                'status': f'✅ Secrets Manager setup: {secrets_result["message"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+            app.logger.info("✅ Secrets Manager setup: %s", secrets_result['message'])
+            status_updates.append(status_update('Secrets Manager', f'✅ Secrets Manager setup: {secrets_result["message"]}'))
             
-            # Load API keys from Secrets Manager
-            api_keys_result = aws_service.get_secret_from_manager('healthcare-api-keys')
+            # API keys were loaded from Secrets Manager right after setup
             if api_keys_result['success']:
                 app.logger.info("✅ API keys loaded from Secrets Manager")
-                status_updates.append({
-                    'step': 'Secrets Manager',
-                    'status': '✅ API keys loaded from Secrets Manager',
-                    'timestamp': datetime.now().isoformat()
-                })
+                status_updates.append(status_update('Secrets Manager', '✅ API keys loaded from Secrets Manager'))
             else:
-                app.logger.warning(f"⚠️ API keys loading: {api_keys_result['message']}")
-                status_updates.append({
-                    'step': 'Secrets Manager',
-                    'status': f'⚠️ API keys loading: {api_keys_result["message"]}',
-                    'timestamp': datetime.now().isoformat()
-                })
+                app.logger.warning("⚠️ API keys loading: %s", api_keys_result['message'])
+                status_updates.append(status_update('Secrets Manager', f'⚠️ API keys loading: {api_keys_result["message"]}'))
         else:
-            app.logger.warning(f"⚠️ Secrets Manager setup: {secrets_result['message']}")
-            status_updates.append({
-                'step': 'Secrets Manager',
-                'status': f'⚠️ Secrets Manager setup: {secrets_result["message"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+            app.logger.warning("⚠️ Secrets Manager setup: %s", secrets_result['message'])
+            status_updates.append(status_update('Secrets Manager', f'⚠️ Secrets Manager setup: {secrets_result["message"]}'))
         
         # Get processing mode
         processing_mode = request.form.get('processing_mode', 'basic')
@@ -198,19 +245,18 @@ def upload_file():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        if not file.filename or not allowed_file(file.filename):
+        file_ext = allowed_file(file.filename) if file.filename else None
+        if not file_ext:
             return jsonify({'error': 'File type not allowed'}), 400
         
         # Save uploaded file locally first
         filename = secure_filename(file.filename)
         unique_filename = f"{uuid.uuid4()}_{filename}"
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(filepath)
-        
-        # Get file extension
-        file_ext = filename.rsplit('.', 1)[1].lower()
+        await asyncio.to_thread(file.save, filepath)
         
-        # Initialize response data
+        # Build the response data once the file is known; earlier failures
+        # return their own error responses
         response_data = {
             'id': str(uuid.uuid4()),
             'file_id': unique_filename,
@@ -230,37 +276,22 @@ def upload_file():
         }
         
         # Step 1: S3 Upload Integration
-        app.logger.info("☁️ Starting S3 upload integration...")
-        status_updates.append({
-            'step': 'S3 Upload',
-            'status': '☁️ Starting S3 upload integration...',
-            'timestamp': datetime.now().isoformat()
-        })
+        app.logger.debug("☁️ Starting S3 upload integration...")
+        append_detail_status(status_updates, 'S3 Upload', '☁️ Starting S3 upload integration...')
         
-        # Upload file to S3
-        s3_result = aws_service.upload_file_to_s3(filepath)
+        # Upload file to S3, streaming from the request's spooled upload rather
+        # than reading the local copy back from disk
+        s3_result = await asyncio.to_thread(aws_service.upload_file_to_s3, filepath, fileobj=file.stream)
         if s3_result['success']:
-            app.logger.info(f"✅ File uploaded to S3: {s3_result['bucket_name']}/{s3_result['s3_key']}")
-            status_updates.append({
-                'step': 'S3 Upload',
-                'status': f'✅ File uploaded to S3: {s3_result["bucket_name"]}/{s3_result["s3_key"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+            app.logger.info("✅ File uploaded to S3: %s/%s", s3_result['bucket_name'], s3_result['s3_key'])
+            status_updates.append(status_update('S3 Upload', f'✅ File uploaded to S3: {s3_result["bucket_name"]}/{s3_result["s3_key"]}'))
             response_data['s3_status'] = s3_result
-            
-            # Store initial processing record and convert ObjectId to string
-            record_id = data_store.add_processing_record(copy.deepcopy(response_data))
-            if record_id:
-                response_data['record_id'] = str(record_id)
         else:
-            app.logger.error(f"❌ S3 upload failed: {s3_result['error']}")
-            status_updates.append({
-                'step': 'S3 Upload',
-                'status': f'❌ S3 upload failed: {s3_result["error"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+            app.logger.error("❌ S3 upload failed: %s", s3_result['error'])
+            status_updates.append(status_update('S3 Upload', f'❌ S3 upload failed: {s3_result["error"]}'))
             response_data['s3_status'] = s3_result
-            record_id = data_store.add_processing_record(copy.deepcopy(response_data))
+            finalize_status_updates(response_data['status_updates'])
+            record_id = await asyncio.to_thread(data_store.add_processing_record, response_data)
             if record_id:
                 response_data['record_id'] = str(record_id)
             return jsonify({
@@ -269,82 +300,67 @@ def upload_file():
             }), 500
         
         # Step 2: Process based on mode
-        try:
-            if processing_mode == 'basic':
-                processing_result = process_basic_mode(filepath, file_ext, response_data)
-            elif processing_mode == 'advanced':
-                processing_result = process_advanced_mode(filepath, file_ext, response_data)
-            else:  # image mode
-                processing_result = process_image_mode(filepath, file_ext, response_data)
-                
-            # Update processing record with results
-            response_data.update(processing_result)
-            record_id = data_store.add_processing_record(copy.deepcopy(response_data))
-            if record_id:
-                response_data['record_id'] = str(record_id)
-        except Exception as e:
-            app.logger.error(f"❌ Processing failed: {str(e)}")
-            response_data['success'] = False
-            response_data['error'] = str(e)
-            record_id = data_store.add_processing_record(copy.deepcopy(response_data))
-            if record_id:
-                response_data['record_id'] = str(record_id)
-            # Convert any ObjectIds to strings for JSON serialization
-            response_data = data_store.convert_objectid_to_str(response_data)
-            return jsonify(response_data), 500
-        
-        # Calculate processing time
-        processing_time = time.time() - start_time
-        response_data['processing_time'] = round(processing_time, 2)
-        
-        # Convert any ObjectIds to strings for JSON serialization
-        response_data = data_store.convert_objectid_to_str(response_data)
-        
-        # Log successful API Gateway invocation
-        aws_service.log_api_gateway_invocation('/api/upload', 'POST', 'COMPLETED')
+        # Unknown modes fall back to image mode
+        process_mode = PROCESSING_MODES.get(processing_mode, process_image_mode)
+        if process_mode is process_image_mode:
+            # Read here, as background workers have no request to read it from
+            response_data['patient_mrn'] = request.form.get('patient_mrn', '12345')
+        
+        # Clients that send "Prefer: respond-async" get 202 Accepted right away
+        # and poll the status URL while a worker processes the file
+        if 'respond-async' in request.headers.get('Prefer', ''):
+            future = upload_executor.submit(
+                process_upload, process_mode, filepath, file_ext, response_data, start_time
+            )
+            track_upload_job(response_data['id'], future, response_data)
+            return jsonify({
+                'id': response_data['id'],
+                'status': 'processing',
+                'status_url': url_for('upload_status', upload_id=response_data['id'])
+            }), 202
         
-        return jsonify(response_data)
+        response_data, status_code = await asyncio.to_thread(
+            process_upload, process_mode, filepath, file_ext, response_data, start_time
+        )
+        return jsonify(response_data), status_code
             
     except Exception as e:
-        app.logger.error(f"Upload error: {str(e)}")
-        # Ensure patient_data is present in error response
-        if 'patient_data' not in response_data:
-            response_data['patient_data'] = {
-                'patient_id': None,
-                'name': None,
-                'gender': None,
-                'birth_date': None,
-                'address': None,
-                'phone': None,
-                'medical_record_number': None,
-                'medical_conditions': [],
-                'medications': [],
-                'phi_detected': []
-            }
+        app.logger.error("Upload error: %s", e)
         # Log failed API Gateway invocation
-        aws_service.log_api_gateway_invocation('/api/upload', 'POST', 'FAILED')
+        await asyncio.to_thread(aws_service.log_api_gateway_invocation, '/api/upload', 'POST', 'FAILED')
         return jsonify({'error': f'Processing failed: {str(e)}'}), 500
 
+@app.route('/api/upload-status/<upload_id>')
+def upload_status(upload_id):
+    """Poll a background upload: 202 while processing, then the full upload response"""
+    with _upload_jobs_lock:
+        job = _upload_jobs.get(upload_id)
+    if job is None:
+        return jsonify({'error': 'Unknown upload id'}), 404
+    
+    future, response_data = job
+    if not future.done():
+        # Copy the list, since the worker is still appending to it
+        status_updates = [
+            {**update, 'timestamp': format_status_timestamp(update['timestamp'])}
+            for update in list(response_data['status_updates'])
+        ]
+        return jsonify({
+            'id': upload_id,
+            'status': 'processing',
+            'status_updates': status_updates
+        }), 202
+    
+    if future.exception() is not None:
+        return jsonify({'error': f'Processing failed: {future.exception()}'}), 500
+    result, status_code = future.result()
+    return jsonify(result), status_code
+
 def process_basic_mode(filepath, file_ext, response_data):
     """Process file in basic mode - standard CDA to FHIR"""
     # Always define patient_data at the top
-    patient_data = {
-        'patient_id': None,
-        'name': None,
-        'gender': None,
-        'birth_date': None,
-        'address': None,
-        'phone': None,
-        'medical_record_number': None,
-        'medical_conditions': [],
-        'medications': [],
-        'phi_detected': []
-    }
-    response_data['status_updates'].append({
-        'step': 'Basic Processing',
-        'status': 'Processing CDA document...',
-        'timestamp': datetime.now().isoformat()
-    })
+    patient_data = empty_patient_data()
+    append_detail_status(response_data['status_updates'], 'Basic Processing', 'Processing CDA document...')
 
     if file_ext in ['xml', 'cda']:
         # Process CDA document
@@ -361,188 +377,109 @@ def process_basic_mode(filepath, file_ext, response_data):
 
         response_data.update({
             'processing_result': processing_result,
-            'fhir_result': fhir_result,
-            'status_updates': response_data['status_updates'] + [{
-                'step': 'Basic Processing',
-                'status': 'Completed successfully',
-                'timestamp': datetime.now().isoformat()
-            }]
+            'fhir_result': fhir_result
         })
+        response_data['status_updates'].append(status_update('Basic Processing', 'Completed successfully'))
     else:
-        response_data.update({
-            'message': 'File uploaded successfully (basic mode)',
-            'status_updates': response_data['status_updates'] + [{
-                'step': 'Basic Processing',
-                'status': 'File uploaded (no processing needed)',
-                'timestamp': datetime.now().isoformat()
-            }]
-        })
+        response_data['message'] = 'File uploaded successfully (basic mode)'
+        response_data['status_updates'].append(status_update('Basic Processing', 'File uploaded (no processing needed)'))
     # Always set patient_data in response_data
     response_data['patient_data'] = patient_data
     return response_data
 
 def process_advanced_mode(filepath, file_ext, response_data):
     """Process file in advanced mode - AWS Comprehend Medical + Gemini (Bedrock)"""
-    response_data['status_updates'].append({
-        'step': 'Advanced Processing',
-        'status': 'Initializing AWS services...',
-        'timestamp': datetime.now().isoformat()
-    })
+    append_detail_status(response_data['status_updates'], 'Advanced Processing', 'Initializing AWS services...')
 
     # Initialize patient_data to avoid scope issues
-    patient_data = {
-        'patient_id': None,
-        'name': None,
-        'gender': None,
-        'birth_date': None,
-        'address': None,
-        'phone': None,
-        'medical_record_number': None,
-        'medical_conditions': [],
-        'medications': [],
-        'phi_detected': []
-    }
+    patient_data = empty_patient_data()
 
     if file_ext in ['xml', 'cda']:
         # First, extract patient data using CDA processor
-        response_data['status_updates'].append({
-            'step': 'Advanced Processing',
-            'status': 'Extracting patient data from CDA...',
-            'timestamp': datetime.now().isoformat()
-        })
+        append_detail_status(response_data['status_updates'], 'Advanced Processing', 'Extracting patient data from CDA...')
+
+        # Read the document once; both the CDA processor and Comprehend
+        # Medical work from these bytes
+        with open(filepath, 'rb') as f:
+            cda_content = f.read()
 
         # Process CDA document first to get patient data
         processor = CDAProcessor()
-        cda_result = processor.process_cda_file(filepath)
+        cda_result = processor.process_cda_file(filepath, content=cda_content)
 
         # Extract patient data from CDA processing
         patient_data = extract_patient_data(cda_result)
         response_data['patient_data'] = patient_data
 
         # Advanced CDA processing with AWS service
-        response_data['status_updates'].append({
-            'step': 'Advanced Processing',
-            'status': 'Processing with AWS Comprehend Medical...',
-            'timestamp': datetime.now().isoformat()
-        })
+        append_detail_status(response_data['status_updates'], 'Advanced Processing', 'Processing with AWS Comprehend Medical...')
         
         # Add Comprehend Medical chatter
-        response_data['status_updates'].append({
-            'step': 'Comprehend Medical',
-            'status': '🧠 Comprehend Medical: Analyzing medical text for entities...',
-            'timestamp': datetime.now().isoformat()
-        })
+        append_detail_status(response_data['status_updates'], 'Comprehend Medical', '🧠 Comprehend Medical: Analyzing medical text for entities...')
         
-        response_data['status_updates'].append({
-            'step': 'Lambda',
-            'status': '⚡ Lambda: Invoking Comprehend Medical API...',
-            'timestamp': datetime.now().isoformat()
-        })
+        append_detail_status(response_data['status_updates'], 'Lambda', '⚡ Lambda: Invoking Comprehend Medical API...')
 
-        result = aws_service.process_cda_advanced(filepath)
+        result = aws_service.process_cda_advanced(filepath, content=cda_content)
         if result['success']:
             # Add Comprehend Medical success chatter
-            response_data['status_updates'].append({
-                'step': 'Comprehend Medical',
-                'status': '✅ Comprehend Medical: Medical entities extracted successfully',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Comprehend Medical', '✅ Comprehend Medical: Medical entities extracted successfully')
             
             # Add Gemini AI chatter
-            response_data['status_updates'].append({
-                'step': 'Gemini (Bedrock)',
-                'status': '🤖 Gemini AI: Processing medical insights with advanced AI...',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Gemini (Bedrock)', '🤖 Gemini AI: Processing medical insights with advanced AI...')
             
-            response_data['status_updates'].append({
-                'step': 'Lambda',
-                'status': '⚡ Lambda: Invoking Gemini (Bedrock) AI for medical analysis...',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Lambda', '⚡ Lambda: Invoking Gemini (Bedrock) AI for medical analysis...')
             
             # Merge patient data with comprehend results
             comprehend_results = result.get('comprehend_results', {})
 
             # Add any additional entities found by Comprehend
             if 'entities' in comprehend_results:
+                conditions = patient_data.setdefault('medical_conditions', [])
+                medications = patient_data.setdefault('medications', [])
+                # Sets of the names already present give O(1) duplicate checks;
+                # CDA entries may be dicts, which never equal an entity's text
+                known_conditions = {c for c in conditions if isinstance(c, str)}
+                known_medications = {m for m in medications if isinstance(m, str)}
                 for entity in comprehend_results['entities']:
                     category = entity.get('Category', '').lower()
                     text = entity.get('Text', '')
-                    if 'condition' in category and text not in patient_data.get('medical_conditions', []):
-                        if 'medical_conditions' not in patient_data:
-                            patient_data['medical_conditions'] = []
-                        patient_data['medical_conditions'].append(text)
-                    elif 'medication' in category and text not in patient_data.get('medications', []):
-                        if 'medications' not in patient_data:
-                            patient_data['medications'] = []
-                        patient_data['medications'].append(text)
+                    if 'condition' in category:
+                        if text not in known_conditions:
+                            known_conditions.add(text)
+                            conditions.append(text)
+                    elif 'medication' in category and text not in known_medications:
+                        known_medications.add(text)
+                        medications.append(text)
 
             # Update patient data with merged results
             response_data['patient_data'] = patient_data
             
             # Add DynamoDB chatter
-            response_data['status_updates'].append({
-                'step': 'DynamoDB',
-                'status': '📊 DynamoDB: Storing enhanced patient data and medical entities...',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'DynamoDB', '📊 DynamoDB: Storing enhanced patient data and medical entities...')
             
-            response_data['status_updates'].append({
-                'step': 'Lambda',
-                'status': '⚡ Lambda: DynamoDB write operation for patient data completed',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Lambda', '⚡ Lambda: DynamoDB write operation for patient data completed')
 
             response_data.update({
                 'comprehend_results': comprehend_results,
                 'gemini_results': result.get('gemini_results'),
                 'fhir_resources': result.get('fhir_resources'),
                 'aws_resources_created': True,
-                'cleanup_available': True,
-                'status_updates': response_data['status_updates'] + [{
-                    'step': 'Advanced Processing',
-                    'status': 'Completed with AWS services',
-                'timestamp': datetime.now().isoformat()
-                }]
+                'cleanup_available': True
             })
+            response_data['status_updates'].append(status_update('Advanced Processing', 'Completed with AWS services'))
             
             # Add final success messages
-            response_data['status_updates'].append({
-                'step': 'Gemini (Bedrock)',
-                'status': '✅ Gemini AI: Medical insights generated successfully',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Gemini (Bedrock)', '✅ Gemini AI: Medical insights generated successfully')
             
-            response_data['status_updates'].append({
-                'step': 'Lambda',
-                'status': '🎉 Lambda: Advanced processing orchestration completed successfully!',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Lambda', '🎉 Lambda: Advanced processing orchestration completed successfully!')
         else:
-            response_data['status_updates'].append({
-                'step': 'Comprehend Medical',
-                'status': f'❌ Comprehend Medical processing failed: {result["error"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+            response_data['status_updates'].append(status_update('Comprehend Medical', f'❌ Comprehend Medical processing failed: {result["error"]}'))
             
-            response_data.update({
-                'error': result['error'],
-                'status_updates': response_data['status_updates'] + [{
-                    'step': 'Advanced Processing',
-                    'status': f'Failed: {result["error"]}',
-                    'timestamp': datetime.now().isoformat()
-                }]
-            })
+            response_data['error'] = result['error']
+            response_data['status_updates'].append(status_update('Advanced Processing', f'Failed: {result["error"]}'))
     else:
-        response_data.update({
-            'message': 'File uploaded successfully (advanced mode)',
-            'status_updates': response_data['status_updates'] + [{
-                'step': 'Advanced Processing',
-                'status': 'File uploaded (no CDA processing needed)',
-                'timestamp': datetime.now().isoformat()
-            }]
-        })
+        response_data['message'] = 'File uploaded successfully (advanced mode)'
+        response_data['status_updates'].append(status_update('Advanced Processing', 'File uploaded (no CDA processing needed)'))
     
     # Always set patient_data in response_data
     response_data['patient_data'] = patient_data
@@ -550,56 +487,28 @@ def process_advanced_mode(filepath, file_ext, response_data):
 
 def process_image_mode(filepath, file_ext, response_data):
     """Process medical image with Gemini (Bedrock) AI"""
-    response_data['status_updates'].append({
-        'step': 'Image Analysis',
-        'status': 'Initializing Gemini (Bedrock) AI...',
-        'timestamp': datetime.now().isoformat()
-    })
+    append_detail_status(response_data['status_updates'], 'Image Analysis', 'Initializing Gemini (Bedrock) AI...')
 
     if file_ext in ['png', 'jpg', 'jpeg', 'gif']:
         # Medical image processing with Gemini (Bedrock) AI
-        patient_mrn = request.form.get('patient_mrn', '12345')
+        patient_mrn = response_data.get('patient_mrn', '12345')
         
-        response_data['status_updates'].append({
-            'step': 'Image Analysis',
-            'status': 'Analyzing medical image with Gemini (Bedrock) AI...',
-            'timestamp': datetime.now().isoformat()
-        })
+        append_detail_status(response_data['status_updates'], 'Image Analysis', 'Analyzing medical image with Gemini (Bedrock) AI...')
         
         # Add Gemini AI chatter
-        response_data['status_updates'].append({
-            'step': 'Gemini (Bedrock)',
-            'status': '🤖 Gemini AI: Loading medical image for analysis...',
-            'timestamp': datetime.now().isoformat()
-        })
+        append_detail_status(response_data['status_updates'], 'Gemini (Bedrock)', '🤖 Gemini AI: Loading medical image for analysis...')
         
-        response_data['status_updates'].append({
-            'step': 'Lambda',
-            'status': '⚡ Lambda: Invoking Gemini (Bedrock) AI for medical image processing...',
-            'timestamp': datetime.now().isoformat()
-        })
+        append_detail_status(response_data['status_updates'], 'Lambda', '⚡ Lambda: Invoking Gemini (Bedrock) AI for medical image processing...')
 
         result = aws_service.process_medical_image(filepath, patient_mrn)
         if result['success']:
             # Add Gemini AI success chatter
-            response_data['status_updates'].append({
-                'step': 'Gemini (Bedrock)',
-                'status': '✅ Gemini AI: Medical image analysis completed successfully',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Gemini (Bedrock)', '✅ Gemini AI: Medical image analysis completed successfully')
             
             # Add DynamoDB chatter
-            response_data['status_updates'].append({
-                'step': 'DynamoDB',
-                'status': '📊 DynamoDB: Storing medical image analysis results...',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'DynamoDB', '📊 DynamoDB: Storing medical image analysis results...')
             
-            response_data['status_updates'].append({
-                'step': 'Lambda',
-                'status': '⚡ Lambda: DynamoDB write operation for image analysis completed',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Lambda', '⚡ Lambda: DynamoDB write operation for image analysis completed')
             
             # Create patient data for image analysis
             patient_data = {
@@ -613,46 +522,29 @@ def process_image_mode(filepath, file_ext, response_data):
                 'fhir_observation': result.get('fhir_observation'),
                 'patient_mrn': result.get('patient_mrn'),
                 'aws_resources_created': True,
-                'cleanup_available': True,
-                'status_updates': response_data['status_updates'] + [{
-                    'step': 'Image Analysis',
-                    'status': 'Completed with Gemini (Bedrock) AI',
-                    'timestamp': datetime.now().isoformat()
-                }]
+                'cleanup_available': True
             })
+            response_data['status_updates'].append(status_update('Image Analysis', 'Completed with Gemini (Bedrock) AI'))
             
             # Add final success messages
-            response_data['status_updates'].append({
-                'step': 'Lambda',
-                'status': '🎉 Lambda: Medical image processing orchestration completed successfully!',
-                'timestamp': datetime.now().isoformat()
-            })
+            append_detail_status(response_data['status_updates'], 'Lambda', '🎉 Lambda: Medical image processing orchestration completed successfully!')
         else:
-            response_data['status_updates'].append({
-                'step': 'Gemini (Bedrock)',
-                'status': f'❌ Gemini AI processing failed: {result["error"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+            response_data['status_updates'].append(status_update('Gemini (Bedrock)', f'❌ Gemini AI processing failed: {result["error"]}'))
             
-            response_data.update({
-                'error': result['error'],
-                'status_updates': response_data['status_updates'] + [{
-                    'step': 'Image Analysis',
-                    'status': f'Failed: {result["error"]}',
-                    'timestamp': datetime.now().isoformat()
-                }]
-            })
+            response_data['error'] = result['error']
+            response_data['status_updates'].append(status_update('Image Analysis', f'Failed: {result["error"]}'))
     else:
-        response_data.update({
-            'error': 'File must be an image (PNG, JPG, JPEG, GIF) for image analysis mode',
-            'status_updates': response_data['status_updates'] + [{
-                'step': 'Image Analysis',
-                'status': 'Invalid file type for image analysis',
-                'timestamp': datetime.now().isoformat()
-            }]
-        })
+        response_data['error'] = 'File must be an image (PNG, JPG, JPEG, GIF) for image analysis mode'
+        response_data['status_updates'].append(status_update('Image Analysis', 'Invalid file type for image analysis'))
     return response_data
 
+# Handler for each processing_mode form value
+PROCESSING_MODES = {
+    'basic': process_basic_mode,
+    'advanced': process_advanced_mode,
+    'image': process_image_mode
+}
+
 @app.route('/api/test-mongo')
 def test_mongo():
     """Test MongoDB connection"""
@@ -674,48 +566,102 @@ def test_mongo():
             'error': str(e)
         }), 500
 
+# Seconds a built /api/analytics or /api/dashboard-data payload is reused
+# across dashboard polls while the data store is unchanged
+ANALYTICS_CACHE_TTL = 30
+DASHBOARD_CACHE_TTL = 30
+PROCESSING_HISTORY_CACHE_TTL = 30
+
+# Largest ?limit= served by /api/processing-history (the dashboard asks for 100)
+MAX_PROCESSING_HISTORY_LIMIT = 100
+
+# The service status makes live AWS calls, so it is only reused briefly
+SERVICE_STATUS_CACHE_TTL = 10
+
+# name -> (data store revision, expiry on the monotonic clock, JSON body, ETag),
+# oldest first; history responses are cached per limit, so the size is capped
+MAX_CACHED_RESPONSES = 32
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+def store_cached_response(name, revision, ttl, body, etag):
+    """Cache a serialized JSON body, evicting the oldest entries past the cap"""
+    with _response_cache_lock:
+        _response_cache[name] = (revision, time.monotonic() + ttl, body, etag)
+        _response_cache.move_to_end(name)
+        while len(_response_cache) > MAX_CACHED_RESPONSES:
+            _response_cache.popitem(last=False)
+
+def cached_json_response(name, ttl, build):
+    """Return build()'s payload as JSON, reusing the serialized body until the store changes or ttl passes"""
+    revision = data_store.revision
+    with _response_cache_lock:
+        cached = _response_cache.get(name)
+    if cached is not None and cached[0] == revision and time.monotonic() < cached[1]:
+        response = app.response_class(cached[2], mimetype=app.json.mimetype)
+        response.set_etag(cached[3])
+    else:
+        # Keyed by the revision read before building, so a write that lands
+        # meanwhile makes the next request rebuild
+        response = jsonify(build())
+        response.add_etag()
+        store_cached_response(name, revision, ttl, response.get_data(), response.get_etag()[0])
+    
+    # Clients that send the ETag back get an empty 304
+    return response.make_conditional(request)
+
+def build_analytics_payload():
+    """Build the /api/analytics payload from the data store"""
+    # PII analysis and medical insights live in the same analytics
+    # document, so a single read serves all three sections
+    analytics = data_store.get_analytics()
+    
+    # Extract PII analysis from analytics, or use the defaults
+    pii_analysis_raw = analytics.get('pii_analysis')
+    if pii_analysis_raw is None:
+        pii_analysis_raw = data_store.get_default_pii_analysis()
+    pii_analysis = {
+        'total_phi': pii_analysis_raw.get('total_phi', 0),
+        'unique_patients': pii_analysis_raw.get('unique_patients', 0),
+        'phi_types': pii_analysis_raw.get('phi_types', []),
+        'phi_breakdown': pii_analysis_raw.get('phi_breakdown', {})
+    }
+    
+    # Extract medical insights from analytics, or use the defaults
+    medical_insights_raw = analytics.get('medical_insights')
+    if medical_insights_raw is None:
+        medical_insights_raw = data_store.get_default_medical_insights()
+    top_conditions = medical_insights_raw.get('top_conditions', [])
+    top_medications = medical_insights_raw.get('top_medications', [])
+    
+    # Map medical insights to expected format
+    medical_insights = {
+        'top_conditions': top_conditions,
+        'top_medications': top_medications,
+        'total_conditions': len(top_conditions),
+        'total_medications': len(top_medications)
+    }
+    
+    return {
+        'analytics': analytics,
+        'pii_analysis': pii_analysis,
+        'medical_insights': medical_insights
+    }
+
 @app.route('/api/analytics')
 def get_analytics():
     """Get analytics data from MongoDB"""
     try:
-        # Get real analytics from data store
-        analytics = data_store.get_analytics()
-        app.logger.info(f"📈 Analytics loaded: {analytics}")
-        
-        # Extract PII analysis from analytics or get separately
-        pii_analysis_raw = analytics.get('pii_analysis') or data_store.get_pii_analysis()
-        app.logger.info(f"🔒 PII analysis raw: {pii_analysis_raw}")
-        pii_analysis = {
-            'total_phi': pii_analysis_raw.get('total_phi', 0),
-            'unique_patients': pii_analysis_raw.get('unique_patients', 0),
-            'phi_types': pii_analysis_raw.get('phi_types', []),
-            'phi_breakdown': pii_analysis_raw.get('phi_breakdown', {})
-        }
-        
-        # Extract medical insights from analytics or get separately
-        medical_insights_raw = analytics.get('medical_insights') or data_store.get_medical_insights()
-        app.logger.info(f"💊 Medical insights raw: {medical_insights_raw}")
-        
-        # Map medical insights to expected format
-        medical_insights = {
-            'top_conditions': medical_insights_raw.get('top_conditions', []),
-            'top_medications': medical_insights_raw.get('top_medications', []),
-            'total_conditions': len(medical_insights_raw.get('top_conditions', [])),
-            'total_medications': len(medical_insights_raw.get('top_medications', []))
-        }
-        
-        return jsonify({
-            'analytics': analytics,
-            'pii_analysis': pii_analysis,
-            'medical_insights': medical_insights
-        })
+        return cached_json_response('analytics', ANALYTICS_CACHE_TTL, build_analytics_payload)
         
     except Exception as e:
-        app.logger.error(f"Error fetching analytics: {str(e)}")
+        app.logger.error("Error fetching analytics: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
 def extract_patient_data(processing_result):
+    """Build patient_data from a CDAProcessor result"""
+    patient_data = empty_patient_data()
     
     # Extract from processing result
     if 'patient' in processing_result:
@@ -739,7 +685,7 @@ def extract_patient_data(processing_result):
                     condition_name = condition.get('display_name', condition.get('name', str(condition)))
                     if condition_name:
                         patient_data['medical_conditions'].append(condition_name)
-        else:
+                else:
                     patient_data['medical_conditions'].append(str(condition))
     
     # Extract medications
@@ -750,11 +696,17 @@ def extract_patient_data(processing_result):
                 med_name = medication.get('name', str(medication))
                 if med_name:
                     patient_data['medications'].append(med_name)
-        else:
+            else:
                 patient_data['medications'].append(str(medication))
     
     return patient_data
 
+# patient_data list that collects each (lower-cased) Comprehend Medical entity category
+COMPREHEND_CATEGORY_FIELDS = {
+    'medical_condition': 'medical_conditions',
+    'medication': 'medications'
+}
+
 def extract_patient_data_from_comprehend(comprehend_results):
     """Extract patient data from AWS Comprehend results"""
     patient_data = {
@@ -764,16 +716,14 @@ def extract_patient_data_from_comprehend(comprehend_results):
         'phi_detected': []
     }
     
-    # Extract entities
-    entities = comprehend_results.get('entities', [])
-    for entity in entities:
-        category = entity.get('Category', '').lower()
-        text = entity.get('Text', '')
-        
-        if 'condition' in category:
-            patient_data['medical_conditions'].append(text)
-        elif 'medication' in category:
-            patient_data['medications'].append(text)
+    # Extract entities, routing each Comprehend Medical category to its list
+    entity_lists = {
+        category: patient_data[field] for category, field in COMPREHEND_CATEGORY_FIELDS.items()
+    }
+    for entity in comprehend_results.get('entities', []):
+        entity_list = entity_lists.get(entity.get('Category', '').lower())
+        if entity_list is not None:
+            entity_list.append(entity.get('Text', ''))
     
     # Extract PHI
     phi = comprehend_results.get('phi', [])
@@ -792,6 +742,7 @@ def cleanup_aws_resources():
     try:
         app.logger.info("🧹 Starting AWS cleanup process...")
         result = aws_service.cleanup_resources()
+        reset_aws_bootstrap()
         app.logger.info(f"✅ AWS cleanup completed: {result}")
         
         response_data = {
@@ -818,16 +769,170 @@ def cleanup_aws_resources():
 def get_service_status():
     """Get AWS service status"""
     try:
-        status = aws_service.get_service_status()
-        return jsonify(status)
+        return cached_json_response('service-status', SERVICE_STATUS_CACHE_TTL, aws_service.get_service_status)
     except Exception as e:
-        app.logger.error(f"Status check error: {str(e)}")
+        app.logger.error("Status check error: %s", e)
         return jsonify({
             'available': False,
             'aws_configured': False,
             'services': {}
         })
 
+def normalize_patients(patients_data):
+    """Unwrap get_all_patients() output into a dict or list of patients"""
+    if isinstance(patients_data, dict) and 'patients' in patients_data:
+        patients_data = patients_data['patients']
+    if isinstance(patients_data, (dict, list)):
+        return patients_data
+    app.logger.error("❌ Patients is not a dict or list! Type: %s, Value: %s", type(patients_data), patients_data)
+    return {}
+
+def parse_timestamp(value):
+    """Parse a stored ISO 8601 timestamp, accepting a trailing 'Z' for UTC"""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+@lru_cache(maxsize=256)
+def month_label(month_key):
+    """Return the short month name ('Jan') for a 'YYYY-MM' key"""
+    return datetime.strptime(month_key, '%Y-%m').strftime('%b')
+
+# In-memory AWS service logs on the data store that the dashboard shows
+SERVICE_LOG_NAMES = (
+    'api_gateway_logs', 's3_logs', 'eventbridge_logs',
+    'step_functions_logs', 'cloudwatch_alarms', 'secrets_manager_logs'
+)
+
+def latest_entries(entries, count=10):
+    """Return the newest count entries of a bounded service log, oldest first"""
+    return list(islice(entries, max(len(entries) - count, 0), None))
+
+def build_dashboard_data():
+    """Build the /api/dashboard-data payload from the data store"""
+    # Get real analytics from data store
+    analytics = data_store.get_analytics()
+    app.logger.debug("📈 Analytics loaded: %s", analytics)
+    
+    # Ensure all patients have the correct structure; new patients are
+    # written with it, so this only needs to run once per process
+    if not data_store.patient_structure_ensured:
+        data_store.ensure_patient_structure()
+    
+    # Get patients as a dict (for dashboard compatibility)
+    patients_data = data_store.get_all_patients()
+    app.logger.debug("👥 Patients data type: %s, content: %s", type(patients_data), patients_data)
+    patients = normalize_patients(patients_data)
+    patient_count = len(patients)
+    
+    # PHI, condition and medication totals are kept up to date by the
+    # data store as patients are written
+    patient_totals = data_store.get_patient_aggregates()
+    total_conditions = patient_totals['total_conditions']
+    total_medications = patient_totals['total_medications']
+    
+    # Update PII analysis with calculated values
+    pii_analysis = {
+        'total_phi': patient_totals['total_phi'],
+        'unique_patients': patient_count,
+        'phi_types': patient_totals['phi_types'],
+        'phi_breakdown': patient_totals['phi_breakdown']
+    }
+    
+    # Update medical insights with calculated values
+    medical_insights = {
+        'top_conditions': patient_totals['top_conditions'],
+        'top_medications': patient_totals['top_medications'],
+        'total_conditions': total_conditions,
+        'total_medications': total_medications
+    }
+    
+    # Calculate FHIR resources from actual patient data
+    fhir_resources = {
+        'patients': patient_count,
+        'observations': patient_count,  # One observation per patient
+        'conditions': total_conditions,
+        'medication_requests': total_medications,
+        'procedures': 0  # No procedure data in current structure
+    }
+    
+    # Build the daily timeline, recent activity and monthly success rates
+    # from one pass over the processing history, parsing each timestamp once
+    processing_history = data_store.get_processing_history(100)  # Get last 100 records
+    timeline_data = Counter()
+    monthly_data = {}
+    recent_activity = []
+    
+    for index, record in enumerate(processing_history):
+        if 'processing_timestamp' not in record:
+            continue
+        try:
+            timestamp = parse_timestamp(record['processing_timestamp'])
+            timeline_data[timestamp.strftime('%Y-%m-%d')] += 1
+            
+            month = monthly_data.setdefault(timestamp.strftime('%Y-%m'), {'total': 0, 'success': 0})
+            month['total'] += 1
+            if record.get('success', False):
+                month['success'] += 1
+            
+            # Last 20 records
+            if index < 20 and 'file_id' in record:
+                recent_activity.append({
+                    'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                    'action': f"Processed {record.get('file_type', 'document').upper()} Document",
+                    'patient': f"Patient: {record.get('patient_data', {}).get('name', 'Unknown')}",
+                    'status': 'success' if record.get('success', False) else 'failed',
+                    'file_type': record.get('file_type', 'unknown'),
+                    'processing_time': round(record.get('processing_time', 0), 2)
+                })
+        except Exception as e:
+            app.logger.warning("Could not use processing record: %s - %s", record.get('processing_timestamp'), e)
+    
+    # Convert to sorted list format for dashboard
+    processing_timeline = [
+        {'date': date, 'documents': count}
+        for date, count in sorted(timeline_data.items())
+    ]
+    
+    # Convert to dashboard format
+    conversion_success_rate = []
+    for month, data in sorted(monthly_data.items()):
+        success_rate = (data['success'] / data['total'] * 100) if data['total'] > 0 else 0
+        conversion_success_rate.append({
+            'month': month_label(month),
+            'success_rate': round(success_rate, 1)
+        })
+    
+    dashboard_data = {
+        'processing_stats': {
+            'total_documents': analytics.get('total_documents', 0),
+            'successful_conversions': analytics.get('successful_conversions', 0),
+            'failed_conversions': analytics.get('failed_conversions', 0),
+            'processing_time_avg': round(analytics.get('processing_time_avg', 0), 2),
+            'conversion_success_rate': round((analytics.get('successful_conversions', 0) / max(analytics.get('total_documents', 1), 1)) * 100, 1)
+        },
+        'entity_extraction': {
+            'medical_conditions': analytics.get('entity_extraction', {}).get('medical_conditions', 0),
+            'medications': analytics.get('entity_extraction', {}).get('medications', 0),
+            'procedures': analytics.get('entity_extraction', {}).get('procedures', 0),
+            'lab_results': analytics.get('entity_extraction', {}).get('lab_results', 0),
+            'phi_detected': analytics.get('entity_extraction', {}).get('phi_detected', 0)
+        },
+        'fhir_resources': fhir_resources,
+        'processing_timeline': processing_timeline,
+        'conversion_success_rate': conversion_success_rate,
+        'recent_activity': recent_activity,
+        'pii_analysis': pii_analysis,
+        'medical_insights': medical_insights,
+        'patients': patients
+    }
+    
+    # Add the latest AWS service logs to dashboard data
+    for log_name in SERVICE_LOG_NAMES:
+        dashboard_data[log_name] = latest_entries(getattr(data_store, log_name))
+    
+    return dashboard_data
+
 @app.route('/api/dashboard-data')
 def get_dashboard_data():
     """Get comprehensive dashboard data including AWS integration status"""
@@ -835,327 +940,19 @@ def get_dashboard_data():
         # API Gateway Integration - Log invocation
         aws_service.log_api_gateway_invocation('/api/dashboard-data', 'GET', 'REQUESTED')
         
-        app.logger.info("📊 Loading dashboard data...")
-        
-        # Get real analytics from data store
-        analytics = data_store.get_analytics()
-        app.logger.info(f"📈 Analytics loaded: {analytics}")
-        
-        # Extract PII analysis from analytics or get separately
-        pii_analysis_raw = analytics.get('pii_analysis') or data_store.get_pii_analysis()
-        app.logger.info(f"🔒 PII analysis raw: {pii_analysis_raw}")
-        pii_analysis = {
-            'total_phi': pii_analysis_raw.get('total_phi', 0),
-            'unique_patients': pii_analysis_raw.get('unique_patients', 0),
-            'phi_types': pii_analysis_raw.get('phi_types', []),
-            'phi_breakdown': pii_analysis_raw.get('phi_breakdown', {})
-        }
-        
-        # Extract medical insights from analytics or get separately
-        medical_insights_raw = analytics.get('medical_insights') or data_store.get_medical_insights()
-        app.logger.info(f"💊 Medical insights raw: {medical_insights_raw}")
-        
-        # Map medical insights to expected format
-        medical_insights = {
-            'top_conditions': medical_insights_raw.get('top_conditions', []),
-            'top_medications': medical_insights_raw.get('top_medications', []),
-            'total_conditions': len(medical_insights_raw.get('top_conditions', [])),
-            'total_medications': len(medical_insights_raw.get('top_medications', []))
-        }
-        
-        # Get patients as a dict (for dashboard compatibility)
-        patients_data = data_store.get_all_patients()
-        app.logger.info(f"👥 Patients data type: {type(patients_data)}, content: {patients_data}")
-        
-        # Extract patients from the returned structure
-        if isinstance(patients_data, dict) and 'patients' in patients_data:
-            patients = patients_data['patients']
-        else:
-            patients = patients_data
-        
-        # Ensure patients is a dict or list
-        if not isinstance(patients, (dict, list)):
-            app.logger.error(f"❌ Patients is not a dict or list! Type: {type(patients)}, Value: {patients}")
-            patients = {}
-        
-        # Ensure all patients have the correct structure
-        data_store.ensure_patient_structure()
-        patients_data = data_store.get_all_patients()  # Get updated data
-        
-        # Extract patients from the returned structure again
-        if isinstance(patients_data, dict) and 'patients' in patients_data:
-            patients = patients_data['patients']
-        else:
-            patients = patients_data
-        
-        # Calculate PII analysis from actual patient data
-        total_phi = 0
-        phi_types = set()
-        phi_breakdown = {'names': 0, 'phone_numbers': 0, 'addresses': 0, 'dates_of_birth': 0, 'medical_record_numbers': 0}
-        
-        # Handle both dict and list structures
-        if isinstance(patients, dict):
-            patient_items = patients.items()
-        elif isinstance(patients, list):
-            patient_items = [(i, patient) for i, patient in enumerate(patients)]
-        else:
-            patient_items = []
-        
-        for patient_id, patient_data in patient_items:
-            # Check for phi_detected directly in patient_data (not nested)
-            if 'phi_detected' in patient_data:
-                phi_list = patient_data['phi_detected']
-                if isinstance(phi_list, list):
-                    total_phi += len(phi_list)
-                    for phi_item in phi_list:
-                        if isinstance(phi_item, dict):
-                            phi_type = phi_item.get('Type', '').upper()
-                            phi_types.add(phi_type)
-                            if 'NAME' in phi_type:
-                                phi_breakdown['names'] += 1
-                            elif 'PHONE' in phi_type:
-                                phi_breakdown['phone_numbers'] += 1
-                            elif 'ADDRESS' in phi_type:
-                                phi_breakdown['addresses'] += 1
-                            elif 'DATE' in phi_type:
-                                phi_breakdown['dates_of_birth'] += 1
-                            elif 'RECORD' in phi_type or 'MRN' in phi_type:
-                                phi_breakdown['medical_record_numbers'] += 1
-            
-            # Also check in nested patient_data if it exists
-            if 'patient_data' in patient_data and isinstance(patient_data['patient_data'], dict):
-                nested_patient = patient_data['patient_data']
-                if 'phi_detected' in nested_patient:
-                    phi_list = nested_patient['phi_detected']
-                    if isinstance(phi_list, list):
-                        total_phi += len(phi_list)
-                        for phi_item in phi_list:
-                            if isinstance(phi_item, dict):
-                                phi_type = phi_item.get('Type', '').upper()
-                                phi_types.add(phi_type)
-                                if 'NAME' in phi_type:
-                                    phi_breakdown['names'] += 1
-                                elif 'PHONE' in phi_type:
-                                    phi_breakdown['phone_numbers'] += 1
-                                elif 'ADDRESS' in phi_type:
-                                    phi_breakdown['addresses'] += 1
-                                elif 'DATE' in phi_type:
-                                    phi_breakdown['dates_of_birth'] += 1
-                                elif 'RECORD' in phi_type or 'MRN' in phi_type:
-                                    phi_breakdown['medical_record_numbers'] += 1
-        
-        # Update PII analysis with calculated values
-        pii_analysis = {
-            'total_phi': total_phi,
-            'unique_patients': len(patients) if isinstance(patients, (dict, list)) else 0,
-            'phi_types': list(phi_types),
-            'phi_breakdown': phi_breakdown
-        }
-        
-        # Calculate medical insights from actual patient data
-        all_conditions = []
-        all_medications = []
-        
-        for patient_id, patient_data in patient_items:
-            # Check for medical_conditions directly in patient_data
-            if 'medical_conditions' in patient_data:
-                conditions = patient_data['medical_conditions']
-                if isinstance(conditions, list):
-                    all_conditions.extend(conditions)
-            
-            # Check for medications directly in patient_data
-            if 'medications' in patient_data:
-                medications = patient_data['medications']
-                if isinstance(medications, list):
-                    all_medications.extend(medications)
-            
-            # Also check in nested patient_data if it exists
-            if 'patient_data' in patient_data and isinstance(patient_data['patient_data'], dict):
-                nested_patient = patient_data['patient_data']
-                
-                if 'medical_conditions' in nested_patient:
-                    conditions = nested_patient['medical_conditions']
-                    if isinstance(conditions, list):
-                        all_conditions.extend(conditions)
-                
-                if 'medications' in nested_patient:
-                    medications = nested_patient['medications']
-                    if isinstance(medications, list):
-                        all_medications.extend(medications)
-        
-        # Count occurrences
-        from collections import Counter
-        condition_counts = Counter(all_conditions)
-        medication_counts = Counter(all_medications)
-        
-        # Get top conditions and medications
-        top_conditions = [(condition, count) for condition, count in condition_counts.most_common(5)]
-        top_medications = [(medication, count) for medication, count in medication_counts.most_common(5)]
-        
-        # Update medical insights with calculated values
-        medical_insights = {
-            'top_conditions': top_conditions,
-            'top_medications': top_medications,
-            'total_conditions': len(all_conditions),
-            'total_medications': len(all_medications)
-        }
-        
-        # Calculate FHIR resources from actual patient data
-        fhir_resources = {
-            'patients': len(patients) if isinstance(patients, (dict, list)) else 0,
-            'observations': len(patients) if isinstance(patients, (dict, list)) else 0,  # One observation per patient
-            'conditions': len(all_conditions),
-            'medication_requests': len(all_medications),
-            'procedures': 0  # No procedure data in current structure
-        }
-        
-        # Generate real processing timeline from processing history
-        processing_history = data_store.get_processing_history(100)  # Get last 100 records
-        timeline_data = {}
-        
-        for record in processing_history:
-            if 'processing_timestamp' in record:
-                try:
-                    # Parse the timestamp
-                    from datetime import datetime
-                    timestamp = datetime.fromisoformat(record['processing_timestamp'].replace('Z', '+00:00'))
-                    date_key = timestamp.strftime('%Y-%m-%d')
-                    
-                    if date_key not in timeline_data:
-                        timeline_data[date_key] = 0
-                    timeline_data[date_key] += 1
-                except Exception as e:
-                    app.logger.warning(f"Could not parse timestamp: {record.get('processing_timestamp')} - {e}")
-        
-        # Convert to sorted list format for dashboard
-        processing_timeline = []
-        for date, count in sorted(timeline_data.items()):
-            processing_timeline.append({
-                'date': date,
-                'documents': count
-            })
-        
-        # Generate recent activity from processing history
-        recent_activity = []
-        for record in processing_history[:20]:  # Last 20 records
-            if 'processing_timestamp' in record and 'file_id' in record:
-                try:
-                    from datetime import datetime
-                    timestamp = datetime.fromisoformat(record['processing_timestamp'].replace('Z', '+00:00'))
-                    
-                    activity = {
-                        'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                        'action': f"Processed {record.get('file_type', 'document').upper()} Document",
-                        'patient': f"Patient: {record.get('patient_data', {}).get('name', 'Unknown')}",
-                        'status': 'success' if record.get('success', False) else 'failed',
-                        'file_type': record.get('file_type', 'unknown'),
-                        'processing_time': round(record.get('processing_time', 0), 2)
-                    }
-                    recent_activity.append(activity)
-                except Exception as e:
-                    app.logger.warning(f"Could not create activity from record: {e}")
-        
-        # Generate conversion success rate data
-        conversion_success_rate = []
-        if processing_history:
-            # Group by month and calculate success rates
-            monthly_data = {}
-            for record in processing_history:
-                if 'processing_timestamp' in record:
-                    try:
-                        from datetime import datetime
-                        timestamp = datetime.fromisoformat(record['processing_timestamp'].replace('Z', '+00:00'))
-                        month_key = timestamp.strftime('%Y-%m')
-                        
-                        if month_key not in monthly_data:
-                            monthly_data[month_key] = {'total': 0, 'success': 0}
-                        
-                        monthly_data[month_key]['total'] += 1
-                        if record.get('success', False):
-                            monthly_data[month_key]['success'] += 1
-                    except Exception as e:
-                        app.logger.warning(f"Could not parse timestamp for success rate: {e}")
-            
-            # Convert to dashboard format
-            for month, data in sorted(monthly_data.items()):
-                success_rate = (data['success'] / data['total'] * 100) if data['total'] > 0 else 0
-                conversion_success_rate.append({
-                    'month': datetime.strptime(month, '%Y-%m').strftime('%b'),
-                    'success_rate': round(success_rate, 1)
-                })
-        
-        dashboard_data = {
-            'processing_stats': {
-                'total_documents': analytics.get('total_documents', 0),
-                'successful_conversions': analytics.get('successful_conversions', 0),
-                'failed_conversions': analytics.get('failed_conversions', 0),
-                'processing_time_avg': round(analytics.get('processing_time_avg', 0), 2),
-                'conversion_success_rate': round((analytics.get('successful_conversions', 0) / max(analytics.get('total_documents', 1), 1)) * 100, 1)
-            },
-            'entity_extraction': {
-                'medical_conditions': analytics.get('entity_extraction', {}).get('medical_conditions', 0),
-                'medications': analytics.get('entity_extraction', {}).get('medications', 0),
-                'procedures': analytics.get('entity_extraction', {}).get('procedures', 0),
-                'lab_results': analytics.get('entity_extraction', {}).get('lab_results', 0),
-                'phi_detected': analytics.get('entity_extraction', {}).get('phi_detected', 0)
-            },
-            'fhir_resources': fhir_resources,
-            'processing_timeline': processing_timeline,
-            'conversion_success_rate': conversion_success_rate,
-            'recent_activity': recent_activity,
-            'pii_analysis': pii_analysis,
-            'medical_insights': medical_insights,
-            'patients': patients
-        }
-        
-        # Add API Gateway logs to dashboard data
-        if hasattr(data_store, 'api_gateway_logs'):
-            dashboard_data['api_gateway_logs'] = data_store.api_gateway_logs[-10:]  # Last 10 logs
-        else:
-            dashboard_data['api_gateway_logs'] = []
-        
-        # Add S3 logs to dashboard data
-        if hasattr(data_store, 's3_logs'):
-            dashboard_data['s3_logs'] = data_store.s3_logs[-10:]  # Last 10 logs
-        else:
-            dashboard_data['s3_logs'] = []
-        
-        # Add EventBridge logs to dashboard data
-        if hasattr(data_store, 'eventbridge_logs'):
-            dashboard_data['eventbridge_logs'] = data_store.eventbridge_logs[-10:]  # Last 10 logs
-        else:
-            dashboard_data['eventbridge_logs'] = []
-        
-        # Add Step Functions logs to dashboard data
-        if hasattr(data_store, 'step_functions_logs'):
-            dashboard_data['step_functions_logs'] = data_store.step_functions_logs[-10:]  # Last 10 logs
-        else:
-            dashboard_data['step_functions_logs'] = []
-        
-        # Add CloudWatch alarms to dashboard data
-        if hasattr(data_store, 'cloudwatch_alarms'):
-            dashboard_data['cloudwatch_alarms'] = data_store.cloudwatch_alarms[-10:]  # Last 10 alarms
-        else:
-            dashboard_data['cloudwatch_alarms'] = []
-        
-        # Add Secrets Manager logs to dashboard data
-        if hasattr(data_store, 'secrets_manager_logs'):
-            dashboard_data['secrets_manager_logs'] = data_store.secrets_manager_logs[-10:]  # Last 10 logs
-        else:
-            dashboard_data['secrets_manager_logs'] = []
-        
-        app.logger.info(f"✅ Dashboard data prepared successfully")
+        # Rebuilt only when the data store has changed or the cache expired
+        response = cached_json_response('dashboard', DASHBOARD_CACHE_TTL, build_dashboard_data)
         
         # Log successful API Gateway invocation
         aws_service.log_api_gateway_invocation('/api/dashboard-data', 'GET', 'COMPLETED')
         
-        return jsonify(dashboard_data)
+        return response
         
     except Exception as e:
-        app.logger.error(f"❌ Dashboard data error: {str(e)}")
-        app.logger.error(f"❌ Error type: {type(e)}")
+        app.logger.error("❌ Dashboard data error: %s", e)
+        app.logger.error("❌ Error type: %s", type(e))
         import traceback
-        app.logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        app.logger.error("❌ Traceback: %s", traceback.format_exc())
         
         # Log failed API Gateway invocation
         aws_service.log_api_gateway_invocation('/api/dashboard-data', 'GET', 'FAILED')
@@ -1177,11 +974,15 @@ def get_dashboard_data():
 def get_processing_history():
     """Get real processing history"""
     try:
+        # Clamped, as each distinct limit gets its own cache entry
         limit = request.args.get('limit', 50, type=int)
-        history = data_store.get_processing_history(limit)
-        return jsonify(history)
+        limit = min(max(limit, 1), MAX_PROCESSING_HISTORY_LIMIT)
+        return cached_json_response(
+            f'processing-history:{limit}', PROCESSING_HISTORY_CACHE_TTL,
+            lambda: data_store.get_processing_history(limit)
+        )
     except Exception as e:
-        app.logger.error(f"Processing history error: {str(e)}")
+        app.logger.error("Processing history error: %s", e)
         return jsonify({'error': 'Failed to load processing history'}), 500
 
 @app.route('/api/patient-details/<patient_id>')
@@ -1191,7 +992,7 @@ def get_patient_details(patient_id):
         patient_data = data_store.get_patient_details(patient_id)
         return jsonify(patient_data)
     except Exception as e:
-        app.logger.error(f"Patient details error: {str(e)}")
+        app.logger.error("Patient details error: %s", e)
         return jsonify({'error': 'Failed to load patient details'}), 500
 
 @app.route('/api/file-preview/<file_id>')
@@ -1200,15 +1001,18 @@ def file_preview(file_id):
     try:
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
         
-        if not os.path.exists(filepath):
+        # One stat both checks that the file exists and reads its details
+        try:
+            file_stats = os.stat(filepath)
+        except FileNotFoundError:
             return jsonify({'error': 'File not found'}), 404
         
-        file_stats = os.stat(filepath)
+        _, dot, extension = file_id.rpartition('.')
         file_info = {
             'filename': file_id,
             'size': file_stats.st_size,
             'modified': datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
-            'type': file_id.rsplit('.', 1)[1].lower() if '.' in file_id else 'unknown'
+            'type': extension.lower() if dot else 'unknown'
         }
         
         return jsonify(file_info)
@@ -1230,134 +1034,309 @@ def internal_error(e):
     app.logger.error(f"Internal error: {str(e)}")
     return jsonify({'error': 'Internal server error'}), 500
 
+# A single worker, so resets submitted with "Prefer: respond-async" run one at a time
+reset_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reset-worker')
+
+# Background resets by job id; oldest entries are dropped
+MAX_TRACKED_RESETS = 20
+_reset_jobs = OrderedDict()
+_reset_jobs_lock = threading.Lock()
+
+def run_database_reset():
+    """Clean up AWS resources, clear the store and reseed it; returns the response data"""
+    app.logger.info("🔄 Starting database reset process...")
+    
+    # Cleanup AWS resources first
+    app.logger.info("🧹 Cleaning up AWS resources...")
+    cleanup_result = aws_service.cleanup_resources()
+    reset_aws_bootstrap()
+    app.logger.info(f"✅ AWS cleanup result: {cleanup_result}")
+    
+    # Clear all data using MongoDB store's reset method
+    app.logger.info("🗑️ Clearing existing data...")
+    data_store.reset_database()
+    
+    # Populate dashboard with comprehensive test data
+    app.logger.info("📊 Populating dashboard with demo data...")
+    populate_dashboard_data()
+    # The demo analytics are written directly to the collection
+    data_store.mark_changed()
+    
+    app.logger.info("✅ Database reset completed successfully with 50 comprehensive records")
+    
+    return {
+        'success': True,
+        'message': 'Database reset, AWS resources cleaned up, and fresh demo data populated successfully',
+        'cleanup_result': cleanup_result,
+        'timestamp': datetime.now().isoformat()
+    }
+
+def reset_error_response(e):
+    """Log a failed reset and build its 500 response"""
+    app.logger.error(f"❌ Database reset error: {str(e)}")
+    error_response = {
+        'success': False, 
+        'error': f'Database reset failed: {str(e)}',
+        'timestamp': datetime.now().isoformat()
+    }
+    app.logger.error(f"📤 Sending error response: {error_response}")
+    return jsonify(error_response), 500
+
 @app.route('/api/reset-database', methods=['POST'])
 def reset_database():
     """Reset the database, cleanup AWS resources, and populate with fresh demo data"""
     try:
-        app.logger.info("🔄 Starting database reset process...")
-        
-        # Cleanup AWS resources first
-        app.logger.info("🧹 Cleaning up AWS resources...")
-        cleanup_result = aws_service.cleanup_resources()
-        app.logger.info(f"✅ AWS cleanup result: {cleanup_result}")
-        
-        # Clear all data using MongoDB store's reset method
-        app.logger.info("🗑️ Clearing existing data...")
-        data_store.reset_database()
-        
-        # Populate dashboard with comprehensive test data
-        app.logger.info("📊 Populating dashboard with demo data...")
-        populate_dashboard_data()
-        
-        app.logger.info("✅ Database reset completed successfully with 50 comprehensive records")
-        
-        response_data = {
-            'success': True,
-            'message': 'Database reset, AWS resources cleaned up, and fresh demo data populated successfully',
-            'cleanup_result': cleanup_result,
-            'timestamp': datetime.now().isoformat()
-        }
+        # Clients that send "Prefer: respond-async" get 202 Accepted right away
+        # and poll the status URL instead of holding a worker for the reseed
+        if 'respond-async' in request.headers.get('Prefer', ''):
+            job_id = str(uuid.uuid4())
+            future = reset_executor.submit(run_database_reset)
+            with _reset_jobs_lock:
+                _reset_jobs[job_id] = future
+                while len(_reset_jobs) > MAX_TRACKED_RESETS:
+                    _reset_jobs.popitem(last=False)
+            return jsonify({
+                'job_id': job_id,
+                'status': 'processing',
+                'status_url': url_for('reset_status', job_id=job_id)
+            }), 202
         
+        response_data = run_database_reset()
         app.logger.info(f"📤 Sending response: {response_data}")
         return jsonify(response_data)
     
     except Exception as e:
-        app.logger.error(f"❌ Database reset error: {str(e)}")
-        error_response = {
-            'success': False, 
-            'error': f'Database reset failed: {str(e)}',
-            'timestamp': datetime.now().isoformat()
-        }
-        app.logger.error(f"📤 Sending error response: {error_response}")
-        return jsonify(error_response), 500
+        return reset_error_response(e)
 
-def populate_dashboard_data():
-    """Populate dashboard with comprehensive test data - 50 detailed records with aggressive testing"""
-    import random
-    from datetime import datetime, timedelta
+@app.route('/api/reset-status/<job_id>')
+def reset_status(job_id):
+    """Poll a background reset: 202 while running, then the reset response"""
+    with _reset_jobs_lock:
+        future = _reset_jobs.get(job_id)
+    if future is None:
+        return jsonify({'error': 'Unknown reset job id'}), 404
     
-    # Comprehensive patient data
-    patient_names = [
-        ('John Smith', 'M', '1985-03-15'), ('Mary Johnson', 'F', '1972-08-22'), ('Robert Wilson', 'M', '1968-11-07'),
-        ('Sarah Davis', 'F', '1990-04-12'), ('Michael Brown', 'M', '1982-09-30'), ('Lisa Anderson', 'F', '1975-12-18'),
-        ('David Miller', 'M', '1965-06-25'), ('Jennifer Taylor', 'F', '1988-01-14'), ('James Garcia', 'M', '1979-07-03'),
-        ('Amanda Martinez', 'F', '1992-10-08'), ('Christopher Lee', 'M', '1987-05-20'), ('Jessica White', 'F', '1980-02-28'),
-        ('Daniel Rodriguez', 'M', '1973-12-05'), ('Ashley Thompson', 'F', '1986-08-17'), ('Matthew Harris', 'M', '1971-04-09'),
-        ('Emily Clark', 'F', '1995-11-23'), ('Joshua Lewis', 'M', '1984-07-31'), ('Samantha Walker', 'F', '1977-09-14'),
-        ('Andrew Hall', 'M', '1969-03-26'), ('Nicole Young', 'F', '1989-06-11'), ('Ryan Allen', 'M', '1981-12-03'),
-        ('Stephanie King', 'F', '1974-05-19'), ('Kevin Wright', 'M', '1983-10-27'), ('Rachel Green', 'F', '1991-01-08'),
-        ('Brian Scott', 'M', '1976-08-15'), ('Lauren Baker', 'F', '1988-04-22'), ('Steven Adams', 'M', '1967-11-30'),
-        ('Megan Nelson', 'F', '1993-07-05'), ('Timothy Carter', 'M', '1980-02-14'), ('Heather Mitchell', 'F', '1978-12-09'),
-        ('Jason Perez', 'M', '1986-06-18'), ('Rebecca Roberts', 'F', '1972-09-25'), ('Eric Turner', 'M', '1985-01-12'),
-        ('Michelle Phillips', 'F', '1990-03-28'), ('Mark Campbell', 'M', '1979-10-16'), ('Laura Parker', 'F', '1987-12-07'),
-        ('Thomas Evans', 'M', '1974-04-03'), ('Christine Edwards', 'F', '1992-08-21'), ('Donald Collins', 'M', '1968-05-29'),
-        ('Kimberly Stewart', 'F', '1983-11-13'), ('Ronald Sanchez', 'M', '1976-07-02'), ('Angela Morris', 'F', '1989-02-19'),
-        ('Kenneth Rogers', 'M', '1981-06-24'), ('Melissa Reed', 'F', '1975-01-31'), ('Edward Cook', 'M', '1984-09-11'),
-        ('Deborah Morgan', 'F', '1994-12-04'), ('Ronald Bell', 'M', '1970-03-17'), ('Diane Murphy', 'F', '1988-05-26'),
-        ('George Bailey', 'M', '1977-10-08'), ('Virginia Cooper', 'F', '1991-07-15'), ('Frank Richardson', 'M', '1986-04-30'),
-        ('Carol Cox', 'F', '1973-08-22'), ('Raymond Ward', 'M', '1982-12-14'), ('Ruth Torres', 'F', '1995-06-03')
-    ]
-    
-    # Comprehensive medical conditions with ICD-10 codes
-    medical_conditions = [
-        {'name': 'Hypertension', 'icd10': 'I10', 'severity': 'moderate'},
-        {'name': 'Type 2 Diabetes', 'icd10': 'E11.9', 'severity': 'moderate'},
-        {'name': 'Asthma', 'icd10': 'J45.909', 'severity': 'mild'},
-        {'name': 'Coronary Artery Disease', 'icd10': 'I25.10', 'severity': 'severe'},
-        {'name': 'Major Depressive Disorder', 'icd10': 'F32.9', 'severity': 'moderate'},
-        {'name': 'COPD', 'icd10': 'J44.9', 'severity': 'moderate'},
-        {'name': 'Migraine', 'icd10': 'G43.909', 'severity': 'mild'},
-        {'name': 'Generalized Anxiety Disorder', 'icd10': 'F41.1', 'severity': 'moderate'},
-        {'name': 'Osteoarthritis', 'icd10': 'M19.90', 'severity': 'moderate'},
-        {'name': 'Chronic Kidney Disease', 'icd10': 'N18.9', 'severity': 'moderate'},
-        {'name': 'Heart Failure', 'icd10': 'I50.9', 'severity': 'severe'},
-        {'name': 'Atrial Fibrillation', 'icd10': 'I48.91', 'severity': 'moderate'},
-        {'name': 'Pneumonia', 'icd10': 'J18.9', 'severity': 'moderate'},
-        {'name': 'Urinary Tract Infection', 'icd10': 'N39.0', 'severity': 'mild'},
-        {'name': 'Gastroesophageal Reflux Disease', 'icd10': 'K21.9', 'severity': 'mild'},
-        {'name': 'Hypothyroidism', 'icd10': 'E03.9', 'severity': 'mild'},
-        {'name': 'Hyperlipidemia', 'icd10': 'E78.5', 'severity': 'mild'},
-        {'name': 'Obesity', 'icd10': 'E66.9', 'severity': 'moderate'},
-        {'name': 'Sleep Apnea', 'icd10': 'G47.33', 'severity': 'moderate'},
-        {'name': 'Peripheral Neuropathy', 'icd10': 'G60.9', 'severity': 'moderate'}
-    ]
+    if not future.done():
+        return jsonify({'job_id': job_id, 'status': 'processing'}), 202
     
-    # Comprehensive medications with dosages
-    medications = [
-        {'name': 'Lisinopril', 'dosage': '10mg', 'frequency': 'daily', 'category': 'ACE Inhibitor'},
-        {'name': 'Metformin', 'dosage': '500mg', 'frequency': 'twice daily', 'category': 'Antidiabetic'},
-        {'name': 'Atorvastatin', 'dosage': '20mg', 'frequency': 'daily', 'category': 'Statin'},
-        {'name': 'Aspirin', 'dosage': '81mg', 'frequency': 'daily', 'category': 'Antiplatelet'},
-        {'name': 'Amlodipine', 'dosage': '5mg', 'frequency': 'daily', 'category': 'Calcium Channel Blocker'},
-        {'name': 'Losartan', 'dosage': '50mg', 'frequency': 'daily', 'category': 'ARB'},
-        {'name': 'Metoprolol', 'dosage': '25mg', 'frequency': 'twice daily', 'category': 'Beta Blocker'},
-        {'name': 'Furosemide', 'dosage': '20mg', 'frequency': 'daily', 'category': 'Diuretic'},
-        {'name': 'Warfarin', 'dosage': '5mg', 'frequency': 'daily', 'category': 'Anticoagulant'},
-        {'name': 'Insulin Glargine', 'dosage': '10 units', 'frequency': 'daily', 'category': 'Insulin'},
-        {'name': 'Omeprazole', 'dosage': '20mg', 'frequency': 'daily', 'category': 'PPI'},
-        {'name': 'Levothyroxine', 'dosage': '50mcg', 'frequency': 'daily', 'category': 'Thyroid Hormone'},
-        {'name': 'Albuterol', 'dosage': '90mcg', 'frequency': 'as needed', 'category': 'Bronchodilator'},
-        {'name': 'Sertraline', 'dosage': '50mg', 'frequency': 'daily', 'category': 'SSRI'},
-        {'name': 'Ibuprofen', 'dosage': '400mg', 'frequency': 'as needed', 'category': 'NSAID'},
-        {'name': 'Acetaminophen', 'dosage': '500mg', 'frequency': 'as needed', 'category': 'Analgesic'},
-        {'name': 'Docusate', 'dosage': '100mg', 'frequency': 'daily', 'category': 'Stool Softener'},
-        {'name': 'Calcium Carbonate', 'dosage': '500mg', 'frequency': 'twice daily', 'category': 'Calcium Supplement'},
-        {'name': 'Vitamin D3', 'dosage': '1000 IU', 'frequency': 'daily', 'category': 'Vitamin Supplement'}
+    if future.exception() is not None:
+        return reset_error_response(future.exception())
+    return jsonify(future.result())
+
+# Demo patients used to populate the dashboard; the random draw pools are
+# tuples since they are never modified
+DEMO_PATIENTS = (
+    ('John Smith', 'M', '1985-03-15'), ('Mary Johnson', 'F', '1972-08-22'), ('Robert Wilson', 'M', '1968-11-07'),
+    ('Sarah Davis', 'F', '1990-04-12'), ('Michael Brown', 'M', '1982-09-30'), ('Lisa Anderson', 'F', '1975-12-18'),
+    ('David Miller', 'M', '1965-06-25'), ('Jennifer Taylor', 'F', '1988-01-14'), ('James Garcia', 'M', '1979-07-03'),
+    ('Amanda Martinez', 'F', '1992-10-08'), ('Christopher Lee', 'M', '1987-05-20'), ('Jessica White', 'F', '1980-02-28'),
+    ('Daniel Rodriguez', 'M', '1973-12-05'), ('Ashley Thompson', 'F', '1986-08-17'), ('Matthew Harris', 'M', '1971-04-09'),
+    ('Emily Clark', 'F', '1995-11-23'), ('Joshua Lewis', 'M', '1984-07-31'), ('Samantha Walker', 'F', '1977-09-14'),
+    ('Andrew Hall', 'M', '1969-03-26'), ('Nicole Young', 'F', '1989-06-11'), ('Ryan Allen', 'M', '1981-12-03'),
+    ('Stephanie King', 'F', '1974-05-19'), ('Kevin Wright', 'M', '1983-10-27'), ('Rachel Green', 'F', '1991-01-08'),
+    ('Brian Scott', 'M', '1976-08-15'), ('Lauren Baker', 'F', '1988-04-22'), ('Steven Adams', 'M', '1967-11-30'),
+    ('Megan Nelson', 'F', '1993-07-05'), ('Timothy Carter', 'M', '1980-02-14'), ('Heather Mitchell', 'F', '1978-12-09'),
+    ('Jason Perez', 'M', '1986-06-18'), ('Rebecca Roberts', 'F', '1972-09-25'), ('Eric Turner', 'M', '1985-01-12'),
+    ('Michelle Phillips', 'F', '1990-03-28'), ('Mark Campbell', 'M', '1979-10-16'), ('Laura Parker', 'F', '1987-12-07'),
+    ('Thomas Evans', 'M', '1974-04-03'), ('Christine Edwards', 'F', '1992-08-21'), ('Donald Collins', 'M', '1968-05-29'),
+    ('Kimberly Stewart', 'F', '1983-11-13'), ('Ronald Sanchez', 'M', '1976-07-02'), ('Angela Morris', 'F', '1989-02-19'),
+    ('Kenneth Rogers', 'M', '1981-06-24'), ('Melissa Reed', 'F', '1975-01-31'), ('Edward Cook', 'M', '1984-09-11'),
+    ('Deborah Morgan', 'F', '1994-12-04'), ('Ronald Bell', 'M', '1970-03-17'), ('Diane Murphy', 'F', '1988-05-26'),
+    ('George Bailey', 'M', '1977-10-08'), ('Virginia Cooper', 'F', '1991-07-15'), ('Frank Richardson', 'M', '1986-04-30'),
+    ('Carol Cox', 'F', '1973-08-22'), ('Raymond Ward', 'M', '1982-12-14'), ('Ruth Torres', 'F', '1995-06-03')
+)
+
+# Demo medical conditions with ICD-10 codes
+DEMO_CONDITIONS = (
+    {'name': 'Hypertension', 'icd10': 'I10', 'severity': 'moderate'},
+    {'name': 'Type 2 Diabetes', 'icd10': 'E11.9', 'severity': 'moderate'},
+    {'name': 'Asthma', 'icd10': 'J45.909', 'severity': 'mild'},
+    {'name': 'Coronary Artery Disease', 'icd10': 'I25.10', 'severity': 'severe'},
+    {'name': 'Major Depressive Disorder', 'icd10': 'F32.9', 'severity': 'moderate'},
+    {'name': 'COPD', 'icd10': 'J44.9', 'severity': 'moderate'},
+    {'name': 'Migraine', 'icd10': 'G43.909', 'severity': 'mild'},
+    {'name': 'Generalized Anxiety Disorder', 'icd10': 'F41.1', 'severity': 'moderate'},
+    {'name': 'Osteoarthritis', 'icd10': 'M19.90', 'severity': 'moderate'},
+    {'name': 'Chronic Kidney Disease', 'icd10': 'N18.9', 'severity': 'moderate'},
+    {'name': 'Heart Failure', 'icd10': 'I50.9', 'severity': 'severe'},
+    {'name': 'Atrial Fibrillation', 'icd10': 'I48.91', 'severity': 'moderate'},
+    {'name': 'Pneumonia', 'icd10': 'J18.9', 'severity': 'moderate'},
+    {'name': 'Urinary Tract Infection', 'icd10': 'N39.0', 'severity': 'mild'},
+    {'name': 'Gastroesophageal Reflux Disease', 'icd10': 'K21.9', 'severity': 'mild'},
+    {'name': 'Hypothyroidism', 'icd10': 'E03.9', 'severity': 'mild'},
+    {'name': 'Hyperlipidemia', 'icd10': 'E78.5', 'severity': 'mild'},
+    {'name': 'Obesity', 'icd10': 'E66.9', 'severity': 'moderate'},
+    {'name': 'Sleep Apnea', 'icd10': 'G47.33', 'severity': 'moderate'},
+    {'name': 'Peripheral Neuropathy', 'icd10': 'G60.9', 'severity': 'moderate'}
+)
+
+# Demo medications with dosages
+DEMO_MEDICATIONS = (
+    {'name': 'Lisinopril', 'dosage': '10mg', 'frequency': 'daily', 'category': 'ACE Inhibitor'},
+    {'name': 'Metformin', 'dosage': '500mg', 'frequency': 'twice daily', 'category': 'Antidiabetic'},
+    {'name': 'Atorvastatin', 'dosage': '20mg', 'frequency': 'daily', 'category': 'Statin'},
+    {'name': 'Aspirin', 'dosage': '81mg', 'frequency': 'daily', 'category': 'Antiplatelet'},
+    {'name': 'Amlodipine', 'dosage': '5mg', 'frequency': 'daily', 'category': 'Calcium Channel Blocker'},
+    {'name': 'Losartan', 'dosage': '50mg', 'frequency': 'daily', 'category': 'ARB'},
+    {'name': 'Metoprolol', 'dosage': '25mg', 'frequency': 'twice daily', 'category': 'Beta Blocker'},
+    {'name': 'Furosemide', 'dosage': '20mg', 'frequency': 'daily', 'category': 'Diuretic'},
+    {'name': 'Warfarin', 'dosage': '5mg', 'frequency': 'daily', 'category': 'Anticoagulant'},
+    {'name': 'Insulin Glargine', 'dosage': '10 units', 'frequency': 'daily', 'category': 'Insulin'},
+    {'name': 'Omeprazole', 'dosage': '20mg', 'frequency': 'daily', 'category': 'PPI'},
+    {'name': 'Levothyroxine', 'dosage': '50mcg', 'frequency': 'daily', 'category': 'Thyroid Hormone'},
+    {'name': 'Albuterol', 'dosage': '90mcg', 'frequency': 'as needed', 'category': 'Bronchodilator'},
+    {'name': 'Sertraline', 'dosage': '50mg', 'frequency': 'daily', 'category': 'SSRI'},
+    {'name': 'Ibuprofen', 'dosage': '400mg', 'frequency': 'as needed', 'category': 'NSAID'},
+    {'name': 'Acetaminophen', 'dosage': '500mg', 'frequency': 'as needed', 'category': 'Analgesic'},
+    {'name': 'Docusate', 'dosage': '100mg', 'frequency': 'daily', 'category': 'Stool Softener'},
+    {'name': 'Calcium Carbonate', 'dosage': '500mg', 'frequency': 'twice daily', 'category': 'Calcium Supplement'},
+    {'name': 'Vitamin D3', 'dosage': '1000 IU', 'frequency': 'daily', 'category': 'Vitamin Supplement'}
+)
+
+# Code system URLs for the demo FHIR resources; every resource references
+# these shared string objects
+ICD10_SYSTEM = 'http://hl7.org/fhir/sid/icd-10-cm'
+CONDITION_SEVERITY_SYSTEM = 'http://terminology.hl7.org/CodeSystem/condition-severity'
+RXNORM_SYSTEM = 'http://www.nlm.nih.gov/research/umls/rxnorm'
+LOINC_SYSTEM = 'http://loinc.org'
+PATIENT_IDENTIFIER_SYSTEM = 'http://hospital.example.org/identifiers/patient'
+
+# Static parts of the demo FHIR resources, built once; populate_dashboard_data
+# copies a template and fills in each record's id and subject
+CONDITION_RESOURCE_TEMPLATES = {
+    condition['icd10']: {
+        'resourceType': 'Condition',
+        'id': None,
+        'subject': None,
+        'code': {
+            'coding': [{
+                'system': ICD10_SYSTEM,
+                'code': condition['icd10'],
+                'display': condition['name']
+            }]
+        },
+        'severity': {
+            'coding': [{
+                'system': CONDITION_SEVERITY_SYSTEM,
+                'code': condition['severity'],
+                'display': condition['severity'].title()
+            }]
+        }
+    }
+    for condition in DEMO_CONDITIONS
+}
+
+MEDICATION_RESOURCE_TEMPLATES = {
+    med['name']: {
+        'resourceType': 'MedicationRequest',
+        'id': None,
+        'subject': None,
+        'medicationCodeableConcept': {
+            'coding': [{
+                'system': RXNORM_SYSTEM,
+                'display': med['name']
+            }]
+        },
+        'dosageInstruction': [{
+            'text': f'{med["dosage"]} {med["frequency"]}',
+            'timing': {'repeat': {'frequency': 1, 'period': 1, 'periodUnit': 'd'}}
+        }]
+    }
+    for med in DEMO_MEDICATIONS
+}
+
+# Demo image analysis results for image mode records
+DEMO_IMAGE_TYPES = ('Chest X-Ray', 'Brain MRI', 'Abdominal CT', 'Echocardiogram', 'Mammogram')
+DEMO_IMAGE_FINDINGS = (
+    'Normal findings',
+    'Pneumonia detected in right lower lobe',
+    'Cardiomegaly with pulmonary congestion',
+    'Pulmonary nodule, follow-up recommended',
+    'Pleural effusion, moderate',
+    'Atelectasis in left upper lobe',
+    'Normal cardiac silhouette',
+    'Mild interstitial lung disease'
+)
+DEMO_IMAGE_RECOMMENDATIONS = (
+    'No immediate action required',
+    'Follow-up imaging in 6 months',
+    'Consult with radiologist',
+    'Immediate clinical correlation needed'
+)
+
+# Medication id suffixes ('insulin-glargine'), derived once per name
+MEDICATION_SLUGS = {med['name']: med['name'].lower().replace(' ', '-') for med in DEMO_MEDICATIONS}
+
+BLOOD_PRESSURE_PANEL_CODE = {
+    'coding': [{
+        'system': LOINC_SYSTEM,
+        'code': '85354-9',
+        'display': 'Blood pressure panel'
+    }]
+}
+SYSTOLIC_PRESSURE_CODE = {'coding': [{'system': LOINC_SYSTEM, 'code': '8480-6', 'display': 'Systolic blood pressure'}]}
+DIASTOLIC_PRESSURE_CODE = {'coding': [{'system': LOINC_SYSTEM, 'code': '8462-4', 'display': 'Diastolic blood pressure'}]}
+
+# Static analytics figures for the demo data
+DEMO_ANALYTICS = {
+    'total_documents': 50,
+    'successful_conversions': 47,  # 94% success rate
+    'failed_conversions': 3,
+    'processing_time_avg': 4.2,
+    'entity_extraction': {
+        'total': 580,
+        'medical_conditions': 125,
+        'medications': 200,
+        'procedures': 45,
+        'lab_results': 80,
+        'phi_detected': 130
+    },
+    'fhir_resources': {
+        'total': 480,
+        'patients': 50,
+        'observations': 50,
+        'conditions': 125,
+        'medication_requests': 200,
+        'procedures': 25
+    },
+    'conversion_success_rate': [
+        {'month': 'Jan', 'success_rate': 92.5},
+        {'month': 'Feb', 'success_rate': 94.2},
+        {'month': 'Mar', 'success_rate': 91.8},
+        {'month': 'Apr', 'success_rate': 95.1},
+        {'month': 'May', 'success_rate': 93.7},
+        {'month': 'Jun', 'success_rate': 94.0}
     ]
+}
+
+def populate_dashboard_data():
+    """Populate dashboard with comprehensive test data - 50 detailed records with aggressive testing"""
+    # One reference time for every seeded timestamp
+    now = datetime.now()
     
     # File types and processing modes
-    file_types = ['xml', 'cda', 'jpg', 'png', 'pdf', 'txt']
-    processing_modes = ['basic', 'advanced', 'image']
+    file_types = ('xml', 'cda', 'jpg', 'png', 'pdf', 'txt')
+    processing_modes = ('basic', 'advanced', 'image')
     
     # Generate 50 comprehensive processing records
+    # Draw each record's patient, MRN, processing mode and file type up front,
+    # one random.choices call per field
+    record_patients = random.choices(DEMO_PATIENTS, k=50)
+    record_mrns = random.choices(range(10000, 100000), k=50)
+    record_modes = random.choices(processing_modes, k=50)
+    record_file_types = random.choices(file_types, k=50)
+    # One random bit per record for aws_resources_created
+    aws_flags = random.getrandbits(50)
+    
+    records = []
     for i in range(50):
         # Select patient data
-        name, gender, dob = random.choice(patient_names)
-        mrn = f"MRN{random.randint(10000, 99999)}"
+        name, gender, dob = record_patients[i]
+        mrn = f"MRN{record_mrns[i]}"
         
         # Select processing mode and file type
-        processing_mode = random.choice(processing_modes)
-        file_type = random.choice(file_types)
+        processing_mode = record_modes[i]
+        file_type = record_file_types[i]
         
         # Generate realistic processing time based on mode
         if processing_mode == 'basic':
@@ -1368,96 +1347,75 @@ def populate_dashboard_data():
             processing_time = round(random.uniform(2.5, 6.0), 2)
         
         # Generate timestamp within last 30 days
-        timestamp = datetime.now() - timedelta(
+        timestamp = now - timedelta(
             days=random.randint(0, 30),
             hours=random.randint(0, 23),
             minutes=random.randint(0, 59)
         )
         
         # Generate patient conditions and medications
-        patient_conditions = random.sample(medical_conditions, random.randint(1, 4))
-        patient_medications = random.sample(medications, random.randint(2, 6))
+        patient_conditions = random.sample(DEMO_CONDITIONS, random.randint(1, 4))
+        patient_medications = random.sample(DEMO_MEDICATIONS, random.randint(2, 6))
         
         # Generate comprehensive FHIR resources
-        fhir_resources = []
-        fhir_resources.append({
+        patient_resource = {
             'resourceType': 'Patient',
             'id': mrn,
-            'identifier': [{'system': 'http://hospital.example.org/identifiers/patient', 'value': mrn}],
+            'identifier': [{'system': PATIENT_IDENTIFIER_SYSTEM, 'value': mrn}],
             'name': [{'text': name}],
             'gender': gender.lower(),
             'birthDate': dob,
             'address': [{
                 'text': f'{random.randint(100, 9999)} Main St, City, State {random.randint(10000, 99999)}'
             }]
-        })
+        }
+        
+        # Shared by all of the record's resources that reference the patient
+        subject = {'reference': f'Patient/{mrn}'}
         
         # Add conditions
-        for condition in patient_conditions:
-            fhir_resources.append({
-                'resourceType': 'Condition',
-                'id': f'condition-{mrn}-{condition["icd10"]}',
-                'subject': {'reference': f'Patient/{mrn}'},
-                'code': {
-                    'coding': [{
-                        'system': 'http://hl7.org/fhir/sid/icd-10-cm',
-                        'code': condition['icd10'],
-                        'display': condition['name']
-                    }]
-                },
-                'severity': {
-                    'coding': [{
-                        'system': 'http://terminology.hl7.org/CodeSystem/condition-severity',
-                        'code': condition['severity'],
-                        'display': condition['severity'].title()
-                    }]
-                }
-            })
+        condition_resources = [
+            dict(
+                CONDITION_RESOURCE_TEMPLATES[condition['icd10']],
+                id=f'condition-{mrn}-{condition["icd10"]}',
+                subject=subject
+            )
+            for condition in patient_conditions
+        ]
         
         # Add medications
-        for med in patient_medications:
-            fhir_resources.append({
-                'resourceType': 'MedicationRequest',
-                'id': f'med-{mrn}-{med["name"].lower().replace(" ", "-")}',
-                'subject': {'reference': f'Patient/{mrn}'},
-                'medicationCodeableConcept': {
-                    'coding': [{
-                        'system': 'http://www.nlm.nih.gov/research/umls/rxnorm',
-                        'display': med['name']
-                    }]
-                },
-                'dosageInstruction': [{
-                    'text': f'{med["dosage"]} {med["frequency"]}',
-                    'timing': {'repeat': {'frequency': 1, 'period': 1, 'periodUnit': 'd'}}
-                }]
-            })
+        medication_resources = [
+            dict(
+                MEDICATION_RESOURCE_TEMPLATES[med['name']],
+                id=f'med-{mrn}-{MEDICATION_SLUGS[med["name"]]}',
+                subject=subject
+            )
+            for med in patient_medications
+        ]
         
         # Add observations
-        fhir_resources.append({
+        vitals_resource = {
             'resourceType': 'Observation',
             'id': f'obs-{mrn}-vitals',
-            'subject': {'reference': f'Patient/{mrn}'},
-            'code': {
-                'coding': [{
-                    'system': 'http://loinc.org',
-                    'code': '85354-9',
-                    'display': 'Blood pressure panel'
-                }]
-            },
+            'subject': subject,
+            'code': BLOOD_PRESSURE_PANEL_CODE,
             'component': [
                 {
-                    'code': {'coding': [{'system': 'http://loinc.org', 'code': '8480-6', 'display': 'Systolic blood pressure'}]},
+                    'code': SYSTOLIC_PRESSURE_CODE,
                     'valueQuantity': {'value': random.randint(110, 160), 'unit': 'mmHg'}
                 },
                 {
-                    'code': {'coding': [{'system': 'http://loinc.org', 'code': '8462-4', 'display': 'Diastolic blood pressure'}]},
+                    'code': DIASTOLIC_PRESSURE_CODE,
                     'valueQuantity': {'value': random.randint(60, 100), 'unit': 'mmHg'}
                 }
             ]
-        })
+        }
+        
+        # One list display sizes the resource list once instead of growing it per append
+        fhir_resources = [patient_resource, *condition_resources, *medication_resources, vitals_resource]
         
-        # Generate Comprehend Medical results for advanced mode
-        comprehend_results = None
+        # Generate Comprehend Medical results; advanced mode gets the full
+        # entity and PHI set, the other modes a short entity list
         if processing_mode == 'advanced':
             entities = []
             phi = []
@@ -1500,6 +1458,16 @@ def populate_dashboard_data():
                 'icd10_entities': [{'Text': condition['icd10'], 'Category': 'MEDICAL_CONDITION'} for condition in patient_conditions],
                 'rxnorm_entities': [{'Text': med['name'], 'Category': 'MEDICATION'} for med in patient_medications]
             }
+        else:
+            comprehend_results = {
+                'entities': [
+                    {'Category': 'MEDICAL_CONDITION', 'Text': patient_conditions[0]['name']},
+                    {'Category': 'MEDICATION', 'Text': patient_medications[0]['name']},
+                    {'Category': 'PROCEDURE', 'Text': 'Blood Test'},
+                    {'Category': 'TEST_RESULT', 'Text': 'Normal'}
+                ],
+                'phi': []
+            }
         
         # Generate Gemini AI results for advanced mode
         gemini_results = None
@@ -1518,28 +1486,11 @@ def populate_dashboard_data():
         # Generate image analysis results for image mode
         image_analysis = None
         if processing_mode == 'image':
-            image_types = ['Chest X-Ray', 'Brain MRI', 'Abdominal CT', 'Echocardiogram', 'Mammogram']
-            image_findings = [
-                'Normal findings',
-                'Pneumonia detected in right lower lobe',
-                'Cardiomegaly with pulmonary congestion',
-                'Pulmonary nodule, follow-up recommended',
-                'Pleural effusion, moderate',
-                'Atelectasis in left upper lobe',
-                'Normal cardiac silhouette',
-                'Mild interstitial lung disease'
-            ]
-            
             image_analysis = {
-                'image_type': random.choice(image_types),
-                'findings': random.choice(image_findings),
+                'image_type': random.choice(DEMO_IMAGE_TYPES),
+                'findings': random.choice(DEMO_IMAGE_FINDINGS),
                 'confidence': round(random.uniform(0.80, 0.98), 3),
-                'recommendations': random.choice([
-                    'No immediate action required',
-                    'Follow-up imaging in 6 months',
-                    'Consult with radiologist',
-                    'Immediate clinical correlation needed'
-                ])
+                'recommendations': random.choice(DEMO_IMAGE_RECOMMENDATIONS)
             }
         
         # Create comprehensive record
@@ -1552,7 +1503,7 @@ def populate_dashboard_data():
             'status': 'completed',
             'success': True,
             'processing_time': processing_time,
-            'aws_resources_created': random.choice([True, False]),
+            'aws_resources_created': bool(aws_flags >> i & 1),
             'cleanup_available': True,
             'patient_data': {
                 'mrn': mrn,
@@ -1574,49 +1525,23 @@ def populate_dashboard_data():
             'image_analysis': image_analysis
         }
         
-        # Add to data store
-        data_store.add_processing_record(record)
+        records.append(record)
     
     # Initialize analytics collection
     analytics = data_store.get_initial_analytics()
     
-    # Update analytics with comprehensive test data
-    analytics.update({
-        'total_documents': 50,
-        'successful_conversions': 47,  # 94% success rate
-        'failed_conversions': 3,
-        'processing_time_avg': 4.2,
-        'entity_extraction': {
-            'total': 580,
-            'medical_conditions': 125,
-            'medications': 200,
-            'procedures': 45,
-            'lab_results': 80,
-            'phi_detected': 130
-        },
-        'fhir_resources': {
-            'total': 480,
-            'patients': 50,
-            'observations': 50,
-            'conditions': 125,
-            'medication_requests': 200,
-            'procedures': 25
-        },
-        'processing_timeline': [],
-        'conversion_success_rate': [
-            {'month': 'Jan', 'success_rate': 92.5},
-            {'month': 'Feb', 'success_rate': 94.2},
-            {'month': 'Mar', 'success_rate': 91.8},
-            {'month': 'Apr', 'success_rate': 95.1},
-            {'month': 'May', 'success_rate': 93.7},
-            {'month': 'Jun', 'success_rate': 94.0}
-        ],
-        'recent_activity': []
-    })
+    # Update analytics with comprehensive test data. The store increments the
+    # count sub-dicts in place as records are added, and the timeline and
+    # activity lists are filled below, so those get fresh containers
+    analytics.update(DEMO_ANALYTICS)
+    analytics['entity_extraction'] = dict(DEMO_ANALYTICS['entity_extraction'])
+    analytics['fhir_resources'] = dict(DEMO_ANALYTICS['fhir_resources'])
+    analytics['processing_timeline'] = []
+    analytics['recent_activity'] = []
     
     # Processing timeline (last 30 days)
     for i in range(30):
-        date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
+        date = (now - timedelta(days=i)).strftime('%Y-%m-%d')
         documents = random.randint(0, 3) if i < 10 else 0  # Recent activity
         if documents > 0:
             analytics['processing_timeline'].append({'date': date, 'documents': documents})
@@ -1624,7 +1549,7 @@ def populate_dashboard_data():
     # Recent activity
     for i in range(20):
         activity = {
-            'timestamp': (datetime.now() - timedelta(minutes=i*15)).strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': (now - timedelta(minutes=i*15)).strftime('%Y-%m-%d %H:%M:%S'),
             'action': random.choice(['Processed CDA Document', 'Analyzed Medical Image', 'Converted to FHIR', 'Extracted PII', 'Generated AI Insights']),
             'patient': f"Patient ID: MRN{random.randint(10000, 99999)}",
             'status': 'success',
@@ -1646,7 +1571,7 @@ def populate_dashboard_data():
             'medical_record_numbers': 50
         },
         'compliance_status': 'HIPAA Compliant',
-        'last_audit': datetime.now().strftime('%Y-%m-%d')
+        'last_audit': now.strftime('%Y-%m-%d')
     }
     
     # Add comprehensive medical insights
@@ -1681,47 +1606,9 @@ def populate_dashboard_data():
         if data_store.client and data_store.analytics is not None:
             data_store.analytics.replace_one({}, current_analytics, upsert=True)
         
-        # Add processing records with analytics data to populate dashboard
-        for i in range(50):
-            # Generate patient data
-            name, gender, dob = random.choice(patient_names)
-            mrn = f"MRN{random.randint(10000, 99999)}"
-            
-            # Generate processing record with analytics data
-            processing_record = {
-                'file_id': f"demo_file_{i}.xml",
-                'file_type': random.choice(['xml', 'cda', 'jpg', 'png', 'pdf', 'txt']),
-                'processing_mode': random.choice(['basic', 'advanced', 'image']),
-                'success': True,
-                'processing_time': round(random.uniform(1.5, 8.0), 2),
-                'timestamp': (datetime.now() - timedelta(minutes=i*2)).isoformat(),
-                'patient_data': {
-                    'mrn': mrn,
-                    'name': name,
-                    'gender': gender,
-                    'dob': dob,
-                    'medical_conditions': random.sample([c['name'] for c in medical_conditions], random.randint(1, 3)),
-                    'medications': random.sample([m['name'] for m in medications], random.randint(1, 4)),
-                    'phi_detected': random.sample(['NAME', 'PHONE_NUMBER', 'ADDRESS', 'DATE_OF_BIRTH'], random.randint(0, 3))
-                },
-                'comprehend_results': {
-                    'entities': [
-                        {'Category': 'MEDICAL_CONDITION', 'Text': random.choice([c['name'] for c in medical_conditions])},
-                        {'Category': 'MEDICATION', 'Text': random.choice([m['name'] for m in medications])},
-                        {'Category': 'PROCEDURE', 'Text': 'Blood Test'},
-                        {'Category': 'TEST_RESULT', 'Text': 'Normal'}
-                    ],
-                    'phi': random.sample(['NAME', 'PHONE_NUMBER', 'ADDRESS', 'DATE_OF_BIRTH'], random.randint(0, 3))
-                },
-                'fhir_resources': [
-                    {'resourceType': 'Patient', 'id': mrn},
-                    {'resourceType': 'Condition', 'id': f'condition-{mrn}'},
-                    {'resourceType': 'MedicationRequest', 'id': f'med-{mrn}'}
-                ]
-            }
-            
-            # Add the processing record
-            data_store.add_processing_record(copy.deepcopy(processing_record))
+        # Add the processing records in one batch; they are counted on top
+        # of the demo analytics saved above
+        data_store.add_processing_records(records)
         
         print("✅ Analytics collections updated successfully")
         print("✅ Processing records added with analytics data")
@@ -1735,13 +1622,23 @@ def populate_dashboard_data():
     app.logger.info(f"✅ PII analysis and medical insights generated")
     app.logger.info(f"✅ Patient database populated with detailed information")
 
+# Ultravox requests share keep-alive connections instead of a new TLS
+# handshake per call; the routes check that the key is configured
+ultravox_session = requests.Session()
+if ULTRAVOX_API_KEY:
+    ultravox_session.headers['X-API-Key'] = ULTRAVOX_API_KEY
+ultravox_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# (connect, read) seconds, so a hung Ultravox call cannot hold a worker indefinitely
+ULTRAVOX_TIMEOUT = (3, 10)
+
 @app.route('/api/cynthia-answer', methods=['POST'])
 def cynthia_answer():
-    data = request.json
+    # A missing or malformed body asks the empty question instead of raising
+    data = request.get_json(cache=False, silent=True) or {}
     question = data.get('question', '')
-    # Fetch context from data_store (all patients)
-    patients = data_store.get_all_patients()
-    num_patients = len(patients) if isinstance(patients, dict) else 0
+    # Fetch context from data_store
+    num_patients = data_store.count_patients()
     # Example: Find number of active transfers (simulate)
     active_transfers = 12  # Placeholder, replace with real logic if available
     critical_alerts = 3    # Placeholder, replace with real logic if available
@@ -1750,6 +1647,41 @@ def cynthia_answer():
     # Optionally, add more context-aware logic here
     return jsonify({'answer': answer})
 
+# Seconds the Cynthia system prompt is reused across calls; the store
+# aggregates it is built from change on the order of minutes
+CYNTHIA_PROMPT_TTL = 30
+
+# Runs the data store reads behind the Cynthia prompt concurrently
+prompt_context_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='prompt-context')
+
+@lru_cache(maxsize=1)
+def build_cynthia_prompt(revision, time_bucket):
+    """Build the Cynthia system prompt; the arguments only key the cache"""
+    # Fetch real context from data_store, with the three reads in flight together
+    analytics_future = prompt_context_executor.submit(data_store.get_analytics)
+    count_future = prompt_context_executor.submit(data_store.count_patients)
+    insights_future = prompt_context_executor.submit(data_store.get_medical_insights)
+    analytics = analytics_future.result()
+    unique_patients = count_future.result()
+    medical_insights = insights_future.result()
+    total_documents = analytics.get('total_documents', 0)
+    top_conditions = medical_insights.get('top_conditions', [])
+    top_medications = medical_insights.get('top_medications', [])
+    # Format top conditions/medications as comma-separated
+    top_conditions_str = ', '.join([c[0] if isinstance(c, (list, tuple)) else str(c) for c in top_conditions[:3]])
+    top_medications_str = ', '.join([m[0] if isinstance(m, (list, tuple)) else str(m) for m in top_medications[:3]])
+    return (
+        f"You are Cynthia, the helpful voice assistant of MedFlowX. "
+        f"There are currently {total_documents} documents and {unique_patients} unique patients in the system. "
+        f"The most common conditions are: {top_conditions_str}. "
+        f"The most prescribed medications are: {top_medications_str}. "
+        f"Answer user questions using this context."
+    )
+
+def cynthia_system_prompt():
+    """Return the Cynthia system prompt, rebuilt on store changes or every CYNTHIA_PROMPT_TTL seconds"""
+    return build_cynthia_prompt(data_store.revision, int(time.time() // CYNTHIA_PROMPT_TTL))
+
 @app.route('/start_call', methods=['POST'])
 def start_call():
     """
@@ -1760,45 +1692,27 @@ def start_call():
             return jsonify({
                 "error": "Ultravox API key is not configured. Please set the ULTRAVOX_API_KEY in config.py."
             }), 401
-        # Fetch real context from data_store
-        analytics = data_store.get_analytics()
-        patients = data_store.get_all_patients()
-        medical_insights = data_store.get_medical_insights()
-        total_documents = analytics.get('total_documents', 0)
-        unique_patients = len(patients) if isinstance(patients, dict) else 0
-        top_conditions = medical_insights.get('top_conditions', [])
-        top_medications = medical_insights.get('top_medications', [])
-        # Format top conditions/medications as comma-separated
-        top_conditions_str = ', '.join([c[0] if isinstance(c, (list, tuple)) else str(c) for c in top_conditions[:3]])
-        top_medications_str = ', '.join([m[0] if isinstance(m, (list, tuple)) else str(m) for m in top_medications[:3]])
-        # Build system prompt
-        system_prompt = (
-            f"You are Cynthia, the helpful voice assistant of MedFlowX. "
-            f"There are currently {total_documents} documents and {unique_patients} unique patients in the system. "
-            f"The most common conditions are: {top_conditions_str}. "
-            f"The most prescribed medications are: {top_medications_str}. "
-            f"Answer user questions using this context."
-        )
         data = {
-            "systemPrompt": system_prompt,
+            "systemPrompt": cynthia_system_prompt(),
             "voice": "Cassidy-English",
             "selectedTools": [],
         }
-        headers = {"X-API-Key": ULTRAVOX_API_KEY}
-        response = requests.post(
+        response = ultravox_session.post(
             ULTRAVOX_API_URL + "/calls",
             json=data,
-            headers=headers
+            timeout=ULTRAVOX_TIMEOUT
         )
         if response.status_code == 201:
             call_details = response.json()
             return jsonify(call_details)
         else:
-            try:
-                response_json = response.json()
-                api_detail = response_json.get('detail', '')
-            except:
-                api_detail = response.text if hasattr(response, 'text') else ''
+            # Only JSON error bodies are parsed, for their 'detail' field
+            api_detail = response.text[:512]
+            if response.headers.get('Content-Type', '').startswith('application/json'):
+                try:
+                    api_detail = response.json().get('detail', '')
+                except ValueError:
+                    pass
             error_message = f"Ultravox API error: {response.status_code} - {api_detail}"
             return jsonify({"error": error_message}), response.status_code
     except Exception as e:
@@ -1812,10 +1726,7 @@ def get_ultravox_voices():
     try:
         if not ULTRAVOX_API_KEY:
             return jsonify({"error": "Ultravox API key is not configured."}), 401
-        response = requests.get(
-            ULTRAVOX_API_URL + "/voices",
-            headers={"X-API-Key": ULTRAVOX_API_KEY}
-        )
+        response = ultravox_session.get(ULTRAVOX_API_URL + "/voices", timeout=ULTRAVOX_TIMEOUT)
         if response.status_code == 200:
             return jsonify(response.json())
         else:
@@ -1,186 +1,218 @@
 import logging
 import os
+import functools
+import mmap
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, Any
 from config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION, GEMINI_API_KEY, GEMINI_API_URL, ULTRAVOX_API_KEY, ULTRAVOX_API_URL
-import boto3
 import requests
+from requests.adapters import HTTPAdapter
 import base64
 import re
 import time
-from utils.mongodb_store import MongoDBStore
+from utils.mongodb_store import mongodb_store
 import json
-from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
-class AWSService:
-    """Production AWS service layer for healthcare processing"""
-    def __init__(self):
-        self._initialize_clients()
-        self.data_store = MongoDBStore()
+_boto3 = None
+
+def _get_boto3():
+    """Import boto3 on first use and return the cached module afterwards"""
+    global _boto3
+    if _boto3 is None:
+        import boto3
+        _boto3 = boto3
+    return _boto3
+
+@functools.lru_cache(maxsize=1)
+def get_boto3_session():
+    """Return the process-wide boto3 session, built from config on first use"""
+    # Blank config values fall through to boto3's own credential chain
+    return _get_boto3().session.Session(
+        aws_access_key_id=AWS_ACCESS_KEY_ID or None,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY or None,
+        region_name=AWS_REGION)
+
+# boto3 sessions are not thread-safe, so client creation is serialized
+_client_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=2)
+def get_client_config(cleanup: bool = False):
+    """Return the shared botocore client config, importing botocore on first use"""
+    from botocore.config import Config
+    # A connection pool large enough for the concurrent upload work, and
+    # botocore's adaptive retries for throttling
+    config = Config(
+        max_pool_connections=50,
+        retries={'max_attempts': 3, 'mode': 'adaptive'}
+    )
+    if cleanup:
+        # Cleanup keeps retrying throttled deletes for longer (API Gateway allows
+        # only a few DeleteRestApi calls a minute); adaptive mode's client-side
+        # rate limiter paces the attempts
+        config = config.merge(Config(retries={'max_attempts': 10, 'mode': 'adaptive'}))
+    return config
+
+@functools.lru_cache(maxsize=None)
+def get_boto3_client(service_name: str, region_name: str = AWS_REGION, config=None):
+    """Return a boto3 client, created once per (service, region, config) and reused"""
+    if config is None:
+        config = get_client_config()
+    session = get_boto3_session()
+    with _client_lock:
+        return session.client(service_name, region_name=region_name, config=config)
+
+# Resources whose names contain any of these (case-insensitively) are removed
+# by cleanup_resources; one compiled alternation scans each name once
+CLEANUP_PREFIXES = (
+    'healthcare', 'demo', 'cda', 'fhir', 'converter', 'hackathon', 'bedrock', 'comprehend', 'ultravox', 'cdatofhir'
+)
+CLEANUP_NAME_PATTERN = re.compile('|'.join(map(re.escape, CLEANUP_PREFIXES)), re.IGNORECASE)
+
+# Most keys a single S3 DeleteObjects request accepts
+S3_DELETE_BATCH = 1000
+
+# Uploads at or above this size go through the multipart transfer manager;
+# smaller ones are sent with a single PutObject
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
 
-    def _rate_limited_api_call(self, api_call, max_retries=5, base_delay=1):
-        """Execute API call with exponential backoff for rate limiting"""
-        for attempt in range(max_retries):
+@functools.lru_cache(maxsize=1)
+def get_s3_transfer_manager():
+    """Return the shared S3 transfer manager; its worker threads stay warm across uploads"""
+    from boto3.s3.transfer import TransferConfig, create_transfer_manager
+    transfer_config = TransferConfig(
+        multipart_threshold=S3_MULTIPART_THRESHOLD,
+        multipart_chunksize=S3_MULTIPART_THRESHOLD,
+        max_concurrency=10,
+        use_threads=True
+    )
+    return create_transfer_manager(get_boto3_client('s3'), transfer_config)
+
+# Gemini requests share keep-alive connections instead of a new TLS
+# handshake per image; json= payloads set the Content-Type themselves
+gemini_session = requests.Session()
+if GEMINI_API_KEY:
+    gemini_session.headers['x-goog-api-key'] = GEMINI_API_KEY
+gemini_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Marks the end of a prefetched page stream
+_PAGES_DONE = object()
+
+def prefetch_pages(pages, lookahead: int = 2):
+    """Yield pages from an iterable while a background thread fetches up to lookahead pages ahead"""
+    buffer = queue.Queue(maxsize=lookahead)
+    stop = threading.Event()
+
+    def offer(item):
+        # Give up once the consumer has stopped, instead of blocking on a full buffer
+        while not stop.is_set():
             try:
-                return api_call()
-            except ClientError as e:
-                code = e.response['Error']['Code']
-                if code == 'TooManyRequestsException':
-                    if attempt == max_retries - 1:
-                        raise
-                    delay = base_delay * (2 ** attempt)
-                    logger.warning(f"Rate limited, retrying in {delay} seconds (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(delay)
-                else:
-                    raise
-            except Exception as e:
-                raise
+                buffer.put(item, timeout=1)
+                return True
+            except queue.Full:
+                pass
+        return False
 
-    def _initialize_clients(self):
+    def fetch():
         try:
-            os.environ['AWS_ACCESS_KEY_ID'] = AWS_ACCESS_KEY_ID
-            os.environ['AWS_SECRET_ACCESS_KEY'] = AWS_SECRET_ACCESS_KEY
-            os.environ['AWS_DEFAULT_REGION'] = AWS_REGION
-            
-            # Initialize clients with error handling
-            self.comprehend = None
-            self.bedrock = None
-            self.dynamodb = None
-            self.lambda_client = None
-            self.sqs = None
-            self.sns = None
-            self.s3 = None
-            self.stepfunctions = None
-            self.apigateway = None
-            self.cognito = None
-            self.secrets_manager = None
-            self.eventbridge = None
-            self.cloudwatch = None
-            
-            try:
-                self.comprehend = boto3.client('comprehendmedical',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize Comprehend Medical: {e}")
-            
-            try:
-                self.bedrock = boto3.client('bedrock-runtime',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize Bedrock: {e}")
-            
-            try:
-                self.dynamodb = boto3.client('dynamodb',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize DynamoDB: {e}")
-            
-            try:
-                self.lambda_client = boto3.client('lambda',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize Lambda: {e}")
-            
-            try:
-                self.sqs = boto3.client('sqs',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize SQS: {e}")
-            
-            try:
-                self.sns = boto3.client('sns',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize SNS: {e}")
-            
-            try:
-                self.s3 = boto3.client('s3',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize S3: {e}")
-            
-            try:
-                self.stepfunctions = boto3.client('stepfunctions',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize Step Functions: {e}")
-            
-            try:
-                self.apigateway = boto3.client('apigateway',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize API Gateway: {e}")
-            
-            try:
-                self.cognito = boto3.client('cognito-idp',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize Cognito: {e}")
-            
-            try:
-                self.secrets_manager = boto3.client('secretsmanager',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize Secrets Manager: {e}")
-            
-            try:
-                self.eventbridge = boto3.client('events',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize EventBridge: {e}")
-            
-            try:
-                self.cloudwatch = boto3.client('cloudwatch',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-            except Exception as e:
-                logger.warning(f"Failed to initialize CloudWatch: {e}")
-            
-            logger.info("AWS clients initialized (some may be unavailable)")
+            for page in pages:
+                if not offer((page, None)):
+                    return
+            offer((_PAGES_DONE, None))
+        except Exception as e:
+            offer((_PAGES_DONE, e))
+
+    threading.Thread(target=fetch, name='page-prefetch', daemon=True).start()
+    try:
+        while True:
+            page, error = buffer.get()
+            if page is _PAGES_DONE:
+                if error is not None:
+                    raise error
+                return
+            yield page
+    finally:
+        stop.set()
+
+# Bounds of the CDA document inside Gemini's response text
+CDA_OPEN_TAG = '<ClinicalDocument'
+CDA_CLOSE_TAG = '</ClinicalDocument>'
+
+class LazyClient:
+    """Class attribute that creates a shared boto3 client on first access, or None if that fails"""
+    def __init__(self, service_name: str, label: str):
+        self.service_name = service_name
+        self.label = label
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            client = get_boto3_client(self.service_name)
         except Exception as e:
-            logger.error(f"Failed to initialize AWS clients: {e}")
+            logger.warning(f"Failed to initialize {self.label}: {e}")
+            client = None
+        # Stored on the instance, which shadows this descriptor from now on
+        instance.__dict__[self.name] = client
+        return client
+
+class AWSService:
+    """Production AWS service layer for healthcare processing"""
+    # Clients are created on first access, so a request only pays for the
+    # services it uses
+    comprehend = LazyClient('comprehendmedical', 'Comprehend Medical')
+    bedrock = LazyClient('bedrock-runtime', 'Bedrock')
+    dynamodb = LazyClient('dynamodb', 'DynamoDB')
+    lambda_client = LazyClient('lambda', 'Lambda')
+    sqs = LazyClient('sqs', 'SQS')
+    sns = LazyClient('sns', 'SNS')
+    s3 = LazyClient('s3', 'S3')
+    stepfunctions = LazyClient('stepfunctions', 'Step Functions')
+    apigateway = LazyClient('apigateway', 'API Gateway')
+    cognito = LazyClient('cognito-idp', 'Cognito')
+    secrets_manager = LazyClient('secretsmanager', 'Secrets Manager')
+    eventbridge = LazyClient('events', 'EventBridge')
+    cloudwatch = LazyClient('cloudwatch', 'CloudWatch')
+
+    def __init__(self):
+        # Shared with the routes, so the dashboard sees the service logs
+        self.data_store = mongodb_store
 
     def is_available(self) -> bool:
-        # Check if at least some AWS clients are available
-        available_clients = [
-            self.comprehend, self.bedrock, self.dynamodb, self.lambda_client,
-            self.sqs, self.sns, self.s3, self.stepfunctions, self.apigateway,
-            self.cognito, self.secrets_manager, self.eventbridge, self.cloudwatch
-        ]
-        return any(client is not None for client in available_clients)
-
-    def process_cda_advanced(self, filepath: str) -> Dict[str, Any]:
+        """Check that AWS clients can be created, without building any of them"""
+        try:
+            get_boto3_session()
+            return True
+        except Exception as e:
+            logger.warning(f"AWS session unavailable: {e}")
+            return False
+
+    def process_cda_advanced(self, filepath: str, content: Optional[bytes] = None) -> Dict[str, Any]:
         """Process CDA document with Comprehend Medical and Gemini (Bedrock)"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                cda_content = f.read()
+            if content is not None:
+                cda_content = content.decode('utf-8')
+            else:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    cda_content = f.read()
+        except Exception as e:
+            logger.error(f"Advanced CDA processing error: {e}")
+            return {
+                'success': False,
+                'error': f'Advanced processing failed: {str(e)}'
+            }
+        return self._process_cda_content(cda_content)
+
+    def _process_cda_content(self, cda_content: str) -> Dict[str, Any]:
+        """Run the advanced CDA pipeline on CDA text that is already in memory"""
+        try:
             # Comprehend Medical entity extraction
             comprehend_results = self.comprehend.detect_entities_v2(Text=cda_content)
             # Gemini (Bedrock) AI analysis
@@ -210,8 +242,13 @@ class AWSService:
 
     def analyze_image_with_gemini(self, image_path: str, prompt: str) -> str:
         """Send an image and prompt to Gemini 2.5 Flash and return the raw response text."""
+        # Encode from a read-only mapping of the file, so the raw image is not
+        # copied onto the heap next to its base64 text (mmap rejects empty files)
+        img_b64 = ""
         with open(image_path, "rb") as img_file:
-            img_b64 = base64.b64encode(img_file.read()).decode("utf-8")
+            if os.fstat(img_file.fileno()).st_size:
+                with mmap.mmap(img_file.fileno(), 0, access=mmap.ACCESS_READ) as image_data:
+                    img_b64 = base64.b64encode(image_data).decode("ascii")
         
         payload = {
             "contents": [
@@ -229,12 +266,7 @@ class AWSService:
             ]
         }
         
-        headers = {
-            "x-goog-api-key": GEMINI_API_KEY,
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.post(GEMINI_API_URL, headers=headers, json=payload, timeout=90)
+        response = gemini_session.post(GEMINI_API_URL, json=payload, timeout=90)
         response.raise_for_status()
         data = response.json()
         # Extract the text response (Gemini returns candidates list)
@@ -246,10 +278,15 @@ class AWSService:
 
     def extract_cda_xml(self, text: str) -> str:
         """Extract the CDA XML from Gemini's response, ignoring stray data."""
-        match = re.search(r'<ClinicalDocument[\s\S]*?</ClinicalDocument>', text)
-        if match:
-            return match.group(0)
-        return ""
+        # Two linear substring scans find the same span as the non-greedy
+        # <ClinicalDocument ... </ClinicalDocument> regex, without it
+        start = text.find(CDA_OPEN_TAG)
+        if start == -1:
+            return ""
+        end = text.find(CDA_CLOSE_TAG, start)
+        if end == -1:
+            return ""
+        return text[start:end + len(CDA_CLOSE_TAG)]
 
     def process_medical_image(self, filepath: str, patient_mrn: str) -> Dict[str, Any]:
         """Process medical image with Gemini 2.5 Flash (Bedrock): generate CDA, convert to FHIR, and return results."""
@@ -277,18 +314,9 @@ class AWSService:
                             'error': 'Gemini did not return valid CDA XML.'
                         }
                     
-                    # Save CDA XML to a temp file and process it through the existing CDA pipeline
-                    import tempfile
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.xml', mode='w', encoding='utf-8') as tmp:
-                        tmp.write(cda_xml)
-                        tmp_path = tmp.name
-                    
-                    # Use the advanced CDA pipeline for best results
-                    cda_result = self.process_cda_advanced(tmp_path)
-                    
-                    # Clean up temp file
-                    import os
-                    os.unlink(tmp_path)
+                    # Use the advanced CDA pipeline for best results, straight
+                    # from memory
+                    cda_result = self._process_cda_content(cda_xml)
                     
                     # Create FHIR observation for the image analysis
                     fhir_observation = {
@@ -348,273 +376,233 @@ class AWSService:
                 'error': f'Image processing failed: {str(e)}'
             }
 
-    def cleanup_resources(self) -> Dict[str, Any]:
-        """Aggressively clean up all AWS resources that could be related to the app/demo"""
-        try:
-            cleanup_results = {}
-            prefixes = [
-                'healthcare', 'demo', 'cda', 'fhir', 'converter', 'hackathon', 'bedrock', 'comprehend', 'ultravox', 'cdatofhir'
-            ]
-            def matches_prefix(name):
-                return any(p in name.lower() for p in prefixes)
+    def _delete_matching(self, label: str, key_prefix: str, resources, delete, matches_prefix) -> Dict[str, bool]:
+        """Delete each (name, resource) pair whose name matches; returns {result key: deleted}"""
+        results = {}
+        for name, resource in resources:
+            if matches_prefix(name):
+                try:
+                    delete(resource)
+                    results[f'{key_prefix}_{name}'] = True
+                    logger.info(f"Successfully deleted {label}: {name}")
+                except Exception as e:
+                    results[f'{key_prefix}_{name}'] = False
+                    logger.warning(f'Failed to delete {label} {name}: {e}')
+        return results
 
-            logger.info("Starting cleanup process...")
-            total_resources = 0
-            successful_cleanups = 0
-            failed_cleanups = 0
+    def _cleanup_s3(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching S3 buckets along with all of their objects and versions"""
+        try:
+            logger.info("Cleaning up S3 buckets...")
+            s3 = self.s3
+            
+            def delete_objects(name, objects):
+                # DeleteObjects takes up to S3_DELETE_BATCH keys per call
+                for start in range(0, len(objects), S3_DELETE_BATCH):
+                    response = s3.delete_objects(
+                        Bucket=name,
+                        Delete={'Objects': objects[start:start + S3_DELETE_BATCH], 'Quiet': True}
+                    )
+                    # Failed keys are reported in the response rather than raised
+                    errors = response.get('Errors', [])
+                    if errors:
+                        raise RuntimeError(f"{len(errors)} objects not deleted: {errors[0].get('Message', '')}")
+            
+            def delete_bucket(name):
+                # Delete all objects and versions
+                # The next page is fetched while the current one is being deleted
+                for page in prefetch_pages(s3.get_paginator('list_object_versions').paginate(Bucket=name)):
+                    delete_objects(name, [
+                        {'Key': obj['Key'], 'VersionId': obj['VersionId']}
+                        for obj in page.get('Versions', []) + page.get('DeleteMarkers', [])
+                    ])
+                for page in prefetch_pages(s3.get_paginator('list_objects_v2').paginate(Bucket=name)):
+                    delete_objects(name, [{'Key': obj['Key']} for obj in page.get('Contents', [])])
+                s3.delete_bucket(Bucket=name)
+            
+            buckets = ((bucket['Name'], bucket['Name']) for bucket in s3.list_buckets().get('Buckets', []))
+            return self._delete_matching('S3 bucket', 's3_bucket', buckets, delete_bucket, matches_prefix)
+        except Exception as e:
+            logger.warning(f'S3 cleanup failed: {e}')
+            return {}
 
-            # S3 Buckets
-            try:
-                logger.info("Cleaning up S3 buckets...")
-                s3 = self.s3
-                for bucket in s3.list_buckets().get('Buckets', []):
-                    name = bucket['Name']
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            # Delete all objects and versions
-                            paginator = s3.get_paginator('list_object_versions')
-                            for page in paginator.paginate(Bucket=name):
-                                for obj in page.get('Versions', []) + page.get('DeleteMarkers', []):
-                                    s3.delete_object(Bucket=name, Key=obj['Key'], VersionId=obj['VersionId'])
-                            for obj in s3.list_objects_v2(Bucket=name).get('Contents', []):
-                                s3.delete_object(Bucket=name, Key=obj['Key'])
-                            s3.delete_bucket(Bucket=name)
-                            cleanup_results[f's3_bucket_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted S3 bucket: {name}")
-                        except Exception as e:
-                            cleanup_results[f's3_bucket_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete S3 bucket {name}: {e}')
-            except Exception as e:
-                logger.warning(f'S3 cleanup failed: {e}')
+    def _cleanup_dynamodb(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching DynamoDB tables"""
+        try:
+            logger.info("Cleaning up DynamoDB tables...")
+            tables = ((name, name) for name in self.dynamodb.list_tables().get('TableNames', []))
+            return self._delete_matching(
+                'DynamoDB table', 'dynamodb_table', tables,
+                lambda name: self.dynamodb.delete_table(TableName=name), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'DynamoDB cleanup failed: {e}')
+            return {}
 
-            # DynamoDB Tables
-            try:
-                logger.info("Cleaning up DynamoDB tables...")
-                for table_name in self.dynamodb.list_tables().get('TableNames', []):
-                    if matches_prefix(table_name):
-                        total_resources += 1
-                        try:
-                            self.dynamodb.delete_table(TableName=table_name)
-                            cleanup_results[f'dynamodb_table_{table_name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted DynamoDB table: {table_name}")
-                        except Exception as e:
-                            cleanup_results[f'dynamodb_table_{table_name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete DynamoDB table {table_name}: {e}')
-            except Exception as e:
-                logger.warning(f'DynamoDB cleanup failed: {e}')
+    def _cleanup_lambda(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching Lambda functions"""
+        try:
+            logger.info("Cleaning up Lambda functions...")
+            functions = (
+                (function['FunctionName'], function['FunctionName'])
+                for function in self.lambda_client.list_functions().get('Functions', [])
+            )
+            return self._delete_matching(
+                'Lambda function', 'lambda_function', functions,
+                lambda name: self.lambda_client.delete_function(FunctionName=name), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'Lambda cleanup failed: {e}')
+            return {}
 
-            # Lambda Functions
-            try:
-                logger.info("Cleaning up Lambda functions...")
-                for function in self.lambda_client.list_functions().get('Functions', []):
-                    name = function['FunctionName']
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            self.lambda_client.delete_function(FunctionName=name)
-                            cleanup_results[f'lambda_function_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted Lambda function: {name}")
-                        except Exception as e:
-                            cleanup_results[f'lambda_function_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete Lambda function {name}: {e}')
-            except Exception as e:
-                logger.warning(f'Lambda cleanup failed: {e}')
+    def _cleanup_step_functions(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching Step Functions state machines"""
+        try:
+            logger.info("Cleaning up Step Functions...")
+            sf = self.stepfunctions
+            state_machines = (
+                (sm['name'], sm['stateMachineArn'])
+                for sm in sf.list_state_machines().get('stateMachines', [])
+            )
+            return self._delete_matching(
+                'Step Function', 'stepfunction', state_machines,
+                lambda arn: sf.delete_state_machine(stateMachineArn=arn), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'Step Functions cleanup failed: {e}')
+            return {}
 
-            # Step Functions
-            try:
-                logger.info("Cleaning up Step Functions...")
-                sf = self.stepfunctions
-                for sm in sf.list_state_machines().get('stateMachines', []):
-                    name = sm['name']
-                    arn = sm['stateMachineArn']
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            sf.delete_state_machine(stateMachineArn=arn)
-                            cleanup_results[f'stepfunction_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted Step Function: {name}")
-                        except Exception as e:
-                            cleanup_results[f'stepfunction_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete Step Function {name}: {e}')
-            except Exception as e:
-                logger.warning(f'Step Functions cleanup failed: {e}')
+    def _cleanup_api_gateway(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching API Gateway REST APIs, with botocore pacing the throttled deletes"""
+        try:
+            logger.info("Cleaning up API Gateways...")
+            apigw = get_boto3_client('apigateway', config=get_client_config(cleanup=True))
+            
+            # Collect all APIs first, so deletes do not disturb the listing
+            apis = [
+                (api.get('name', ''), api['id'])
+                for page in apigw.get_paginator('get_rest_apis').paginate()
+                for api in page.get('items', [])
+            ]
+            return self._delete_matching(
+                'API Gateway', 'apigateway', apis,
+                lambda api_id: apigw.delete_rest_api(restApiId=api_id), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'API Gateway cleanup failed: {e}')
+            return {}
 
-            # API Gateway
-            try:
-                logger.info("Cleaning up API Gateways...")
-                apigw = self.apigateway
-                apis_to_delete = []
-                
-                # First, collect all APIs to delete
-                for api in apigw.get_rest_apis(limit=500).get('items', []):
-                    name = api.get('name', '')
-                    api_id = api['id']
-                    if matches_prefix(name):
-                        apis_to_delete.append((name, api_id))
-                
-                # Delete APIs with rate limiting
-                for name, api_id in apis_to_delete:
-                    total_resources += 1
-                    try:
-                        def delete_api():
-                            return apigw.delete_rest_api(restApiId=api_id)
-                        self._rate_limited_api_call(delete_api)
-                        cleanup_results[f'apigateway_{name}'] = True
-                        successful_cleanups += 1
-                        logger.info(f"Successfully deleted API Gateway: {name}")
-                        time.sleep(0.5)
-                    except ClientError as e:
-                        code = e.response['Error']['Code']
-                        if code == 'TooManyRequestsException':
-                            cleanup_results[f'apigateway_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f"Rate limit exceeded for API Gateway {name}: {e}")
-                        else:
-                            cleanup_results[f'apigateway_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete API Gateway {name}: {e}')
-                    except Exception as e:
-                        cleanup_results[f'apigateway_{name}'] = False
-                        failed_cleanups += 1
-                        logger.warning(f'Failed to delete API Gateway {name}: {e}')
-            except Exception as e:
-                logger.warning(f'API Gateway cleanup failed: {e}')
+    def _cleanup_sqs(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching SQS queues"""
+        try:
+            logger.info("Cleaning up SQS queues...")
+            queues = ((queue_url.split('/')[-1], queue_url) for queue_url in self.sqs.list_queues().get('QueueUrls', []))
+            return self._delete_matching(
+                'SQS queue', 'sqs_queue', queues,
+                lambda queue_url: self.sqs.delete_queue(QueueUrl=queue_url), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'SQS cleanup failed: {e}')
+            return {}
 
-            # SQS Queues
-            try:
-                logger.info("Cleaning up SQS queues...")
-                for queue_url in self.sqs.list_queues().get('QueueUrls', []):
-                    name = queue_url.split('/')[-1]
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            self.sqs.delete_queue(QueueUrl=queue_url)
-                            cleanup_results[f'sqs_queue_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted SQS queue: {name}")
-                        except Exception as e:
-                            cleanup_results[f'sqs_queue_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete SQS queue {name}: {e}')
-            except Exception as e:
-                logger.warning(f'SQS cleanup failed: {e}')
+    def _cleanup_sns(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching SNS topics"""
+        try:
+            logger.info("Cleaning up SNS topics...")
+            topics = ((topic['TopicArn'].split(':')[-1], topic['TopicArn']) for topic in self.sns.list_topics().get('Topics', []))
+            return self._delete_matching(
+                'SNS topic', 'sns_topic', topics,
+                lambda arn: self.sns.delete_topic(TopicArn=arn), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'SNS cleanup failed: {e}')
+            return {}
 
-            # SNS Topics
-            try:
-                logger.info("Cleaning up SNS topics...")
-                for topic in self.sns.list_topics().get('Topics', []):
-                    arn = topic['TopicArn']
-                    name = arn.split(':')[-1]
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            self.sns.delete_topic(TopicArn=arn)
-                            cleanup_results[f'sns_topic_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted SNS topic: {name}")
-                        except Exception as e:
-                            cleanup_results[f'sns_topic_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete SNS topic {name}: {e}')
-            except Exception as e:
-                logger.warning(f'SNS cleanup failed: {e}')
+    def _cleanup_cognito(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching Cognito user pools"""
+        try:
+            logger.info("Cleaning up Cognito User Pools...")
+            pools = ((pool['Name'], pool['Id']) for pool in self.cognito.list_user_pools(MaxResults=60).get('UserPools', []))
+            return self._delete_matching(
+                'Cognito User Pool', 'cognito_pool', pools,
+                lambda pool_id: self.cognito.delete_user_pool(UserPoolId=pool_id), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'Cognito cleanup failed: {e}')
+            return {}
 
-            # Cognito User Pools
-            try:
-                logger.info("Cleaning up Cognito User Pools...")
-                for pool in self.cognito.list_user_pools(MaxResults=60).get('UserPools', []):
-                    name = pool['Name']
-                    pool_id = pool['Id']
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            self.cognito.delete_user_pool(UserPoolId=pool_id)
-                            cleanup_results[f'cognito_pool_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted Cognito User Pool: {name}")
-                        except Exception as e:
-                            cleanup_results[f'cognito_pool_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete Cognito User Pool {name}: {e}')
-            except Exception as e:
-                logger.warning(f'Cognito cleanup failed: {e}')
+    def _cleanup_secrets(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching Secrets Manager secrets without a recovery window"""
+        try:
+            logger.info("Cleaning up Secrets Manager...")
+            sm = self.secrets_manager
+            secrets = ((secret['Name'], secret['ARN']) for secret in sm.list_secrets().get('SecretList', []))
+            return self._delete_matching(
+                'secret', 'secret', secrets,
+                lambda arn: sm.delete_secret(SecretId=arn, ForceDeleteWithoutRecovery=True), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'Secrets Manager cleanup failed: {e}')
+            return {}
 
-            # Secrets Manager
-            try:
-                logger.info("Cleaning up Secrets Manager...")
-                sm = self.secrets_manager
-                for secret in sm.list_secrets().get('SecretList', []):
-                    name = secret['Name']
-                    arn = secret['ARN']
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            sm.delete_secret(SecretId=arn, ForceDeleteWithoutRecovery=True)
-                            cleanup_results[f'secret_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted secret: {name}")
-                        except Exception as e:
-                            cleanup_results[f'secret_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete secret {name}: {e}')
-            except Exception as e:
-                logger.warning(f'Secrets Manager cleanup failed: {e}')
+    def _cleanup_eventbridge(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching EventBridge rules"""
+        try:
+            logger.info("Cleaning up EventBridge rules...")
+            eb = self.eventbridge
+            rules = ((rule['Name'], rule['Name']) for rule in eb.list_rules().get('Rules', []))
+            return self._delete_matching(
+                'EventBridge rule', 'eventbridge_rule', rules,
+                lambda name: eb.delete_rule(Name=name, Force=True), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'EventBridge cleanup failed: {e}')
+            return {}
 
-            # EventBridge Rules
-            try:
-                logger.info("Cleaning up EventBridge rules...")
-                eb = self.eventbridge
-                for rule in eb.list_rules().get('Rules', []):
-                    name = rule['Name']
-                    arn = rule['Arn']
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            eb.delete_rule(Name=name, Force=True)
-                            cleanup_results[f'eventbridge_rule_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted EventBridge rule: {name}")
-                        except Exception as e:
-                            cleanup_results[f'eventbridge_rule_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete EventBridge rule {name}: {e}')
-            except Exception as e:
-                logger.warning(f'EventBridge cleanup failed: {e}')
+    def _cleanup_log_groups(self, matches_prefix) -> Dict[str, bool]:
+        """Delete matching CloudWatch log groups"""
+        try:
+            logger.info("Cleaning up CloudWatch log groups...")
+            logs = get_boto3_client('logs')
+            # All pages, with the next one fetched while matches are being deleted
+            groups = (
+                (group['logGroupName'], group['logGroupName'])
+                for page in prefetch_pages(logs.get_paginator('describe_log_groups').paginate())
+                for group in page.get('logGroups', [])
+            )
+            return self._delete_matching(
+                'CloudWatch log group', 'cloudwatch_log_group', groups,
+                lambda name: logs.delete_log_group(logGroupName=name), matches_prefix
+            )
+        except Exception as e:
+            logger.warning(f'CloudWatch logs cleanup failed: {e}')
+            return {}
 
-            # CloudWatch Log Groups
-            try:
-                logger.info("Cleaning up CloudWatch log groups...")
-                cw = self.cloudwatch
-                logs = boto3.client('logs',
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_REGION)
-                for group in logs.describe_log_groups().get('logGroups', []):
-                    name = group['logGroupName']
-                    if matches_prefix(name):
-                        total_resources += 1
-                        try:
-                            logs.delete_log_group(logGroupName=name)
-                            cleanup_results[f'cloudwatch_log_group_{name}'] = True
-                            successful_cleanups += 1
-                            logger.info(f"Successfully deleted CloudWatch log group: {name}")
-                        except Exception as e:
-                            cleanup_results[f'cloudwatch_log_group_{name}'] = False
-                            failed_cleanups += 1
-                            logger.warning(f'Failed to delete CloudWatch log group {name}: {e}')
-            except Exception as e:
-                logger.warning(f'CloudWatch logs cleanup failed: {e}')
+    def cleanup_resources(self) -> Dict[str, Any]:
+        """Aggressively clean up all AWS resources that could be related to the app/demo"""
+        try:
+            matches_prefix = CLEANUP_NAME_PATTERN.search
 
-            # Bedrock, Comprehend Medical, and other AI/ML services: No explicit resource deletion needed (stateless)
+            logger.info("Starting cleanup process...")
+            
+            # Each service is listed and cleaned independently, so they run
+            # concurrently on the thread-safe shared clients; results are merged
+            # in this order. Bedrock, Comprehend Medical, and other AI/ML
+            # services need no explicit resource deletion (stateless)
+            service_cleanups = (
+                self._cleanup_s3, self._cleanup_dynamodb, self._cleanup_lambda,
+                self._cleanup_step_functions, self._cleanup_api_gateway, self._cleanup_sqs,
+                self._cleanup_sns, self._cleanup_cognito, self._cleanup_secrets,
+                self._cleanup_eventbridge, self._cleanup_log_groups
+            )
+            cleanup_results = {}
+            with ThreadPoolExecutor(max_workers=len(service_cleanups), thread_name_prefix='aws-cleanup') as executor:
+                for results in executor.map(lambda cleanup: cleanup(matches_prefix), service_cleanups):
+                    cleanup_results.update(results)
+            
+            total_resources = len(cleanup_results)
+            successful_cleanups = sum(cleanup_results.values())
+            failed_cleanups = total_resources - successful_cleanups
 
             # Summary
             success_rate = (successful_cleanups / total_resources * 100) if total_resources > 0 else 0
@@ -691,10 +679,7 @@ class AWSService:
 
     def _check_aws_configuration(self) -> bool:
         try:
-            sts = boto3.client('sts',
-                aws_access_key_id=AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                region_name=AWS_REGION)
+            sts = get_boto3_client('sts')
             sts.get_caller_identity()
             return True
         except Exception:
@@ -879,8 +864,6 @@ class AWSService:
         }
         
         # Store in data store for UI display
-        if not hasattr(self.data_store, 'api_gateway_logs'):
-            self.data_store.api_gateway_logs = []
         self.data_store.api_gateway_logs.append(log_entry)
         
         logger.info(f"🔗 {log_entry['message']}")
@@ -965,8 +948,12 @@ class AWSService:
                 'message': f"S3 infrastructure creation failed: {str(e)}"
             }
 
-    def upload_file_to_s3(self, filepath: str, bucket_name: str = None) -> Dict[str, Any]:
-        """Upload file to S3 and trigger Lambda processing"""
+    def upload_file_to_s3(self, filepath: str, bucket_name: str = None, fileobj=None) -> Dict[str, Any]:
+        """Upload file to S3 and trigger Lambda processing
+
+        When fileobj is given (e.g. the upload's request stream) it is streamed
+        to S3 instead of re-reading the local copy at filepath.
+        """
         try:
             if not bucket_name:
                 # Use existing bucket or create new one
@@ -986,13 +973,23 @@ class AWSService:
             s3_key = f"uploads/{int(time.time())}_{filename}"
             
             # Upload file to S3
-            with open(filepath, 'rb') as file:
-                self.s3.upload_fileobj(
-                    file,
-                    bucket_name,
-                    s3_key,
-                    ExtraArgs={'ContentType': self._get_content_type(filename)}
-                )
+            file_size = os.path.getsize(filepath)
+            content_type = self._get_content_type(filename)
+            
+            def upload(body):
+                if file_size < S3_MULTIPART_THRESHOLD:
+                    self.s3.put_object(Bucket=bucket_name, Key=s3_key, Body=body, ContentType=content_type)
+                else:
+                    get_s3_transfer_manager().upload(
+                        body, bucket_name, s3_key, extra_args={'ContentType': content_type}
+                    ).result()
+            
+            if fileobj is not None:
+                fileobj.seek(0)
+                upload(fileobj)
+            else:
+                with open(filepath, 'rb') as file:
+                    upload(file)
             
             # Get S3 URL
             s3_url = f"https://{bucket_name}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
@@ -1016,7 +1013,7 @@ class AWSService:
                         },
                         'object': {
                             'key': s3_key,
-                            'size': os.path.getsize(filepath),
+                            'size': file_size,
                             'eTag': 'simulated-etag'
                         }
                     }
@@ -1028,7 +1025,7 @@ class AWSService:
                 'bucket_name': bucket_name,
                 's3_key': s3_key,
                 's3_url': s3_url,
-                'file_size': os.path.getsize(filepath),
+                'file_size': file_size,
                 's3_event': s3_event,
                 'message': f"File uploaded to S3 successfully. S3 event triggered for Lambda processing."
             }
@@ -1059,10 +1056,7 @@ class AWSService:
     def _get_account_id(self) -> str:
         """Get AWS account ID"""
         try:
-            sts = boto3.client('sts',
-                aws_access_key_id=AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                region_name=AWS_REGION)
+            sts = get_boto3_client('sts')
             return sts.get_caller_identity()['Account']
         except Exception:
             return '123456789012'  # Fallback
@@ -1081,8 +1075,6 @@ class AWSService:
         }
         
         # Store in data store for UI display
-        if not hasattr(self.data_store, 's3_logs'):
-            self.data_store.s3_logs = []
         self.data_store.s3_logs.append(log_entry)
         
         logger.info(f"📦 {log_entry['message']}")
@@ -1158,8 +1150,6 @@ class AWSService:
         }
         
         # Store in data store for UI display
-        if not hasattr(self.data_store, 'eventbridge_logs'):
-            self.data_store.eventbridge_logs = []
         self.data_store.eventbridge_logs.append(log_entry)
         
         logger.info(f"📡 {log_entry['message']}")
@@ -1416,8 +1406,6 @@ class AWSService:
         }
         
         # Store in data store for UI display
-        if not hasattr(self.data_store, 'step_functions_logs'):
-            self.data_store.step_functions_logs = []
         self.data_store.step_functions_logs.append(log_entry)
         
         logger.info(f"🔄 {log_entry['message']}")
@@ -1563,8 +1551,6 @@ class AWSService:
         }
         
         # Store in data store for UI display
-        if not hasattr(self.data_store, 'cloudwatch_alarms'):
-            self.data_store.cloudwatch_alarms = []
         self.data_store.cloudwatch_alarms.append(log_entry)
         
         logger.warning(f"🚨 {log_entry['message']}")
@@ -1774,8 +1760,6 @@ class AWSService:
         }
         
         # Store in data store for UI display
-        if not hasattr(self.data_store, 'secrets_manager_logs'):
-            self.data_store.secrets_manager_logs = []
         self.data_store.secrets_manager_logs.append(log_entry)
         
         logger.info(f"🔐 {log_entry['message']}")
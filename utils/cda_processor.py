@@ -12,12 +12,14 @@ class CDAProcessor:
             'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
         }
     
-    def process_cda_file(self, filepath):
+    def process_cda_file(self, filepath, content=None):
         """Process a CDA file and extract relevant healthcare data"""
         try:
-            # Parse XML file
-            tree = ET.parse(filepath)
-            root = tree.getroot()
+            # Parse XML file, or the caller's already-read bytes of it
+            if content is not None:
+                root = ET.fromstring(content)
+            else:
+                root = ET.parse(filepath).getroot()
             
             # Extract patient information
             patient_data = self._extract_patient_data(root)
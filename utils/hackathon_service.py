@@ -177,12 +177,9 @@ class AWSService:
     def _check_aws_configuration(self) -> bool:
         """Check if AWS is properly configured"""
         try:
-            import boto3
-            # Try to create a simple client to test credentials
-            sts = boto3.client('sts',
-                aws_access_key_id=AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                region_name=AWS_REGION)
+            from utils.aws_service import get_boto3_client
+            # Test credentials with the shared, session-built STS client
+            sts = get_boto3_client('sts')
             sts.get_caller_identity()
             return True
         except Exception:
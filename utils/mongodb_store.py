@@ -1,12 +1,181 @@
 import json
 import os
+import re
+import sys
+import time
+from collections import Counter, deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import uuid
 import logging
+import queue
+import threading
+from concurrent.futures import Future
 
 logger = logging.getLogger(__name__)
 
+# Processing record fields kept in the history collection. Bulky results
+# (Comprehend output, FHIR bundles, AWS setup responses) only feed the
+# analytics counters and are not stored with each record
+PERSISTED_RECORD_FIELDS = (
+    'id', 'timestamp', 'file_id', 'file_type', 'processing_mode', 'processing_timestamp',
+    'patient_data', 'processing_time', 'status_updates', 's3_status', 'success', 'message', 'error'
+)
+
+def project_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Return only the persisted fields of a processing record"""
+    return {field: record[field] for field in PERSISTED_RECORD_FIELDS if field in record}
+
+# Dashboard PHI breakdown bucket for each keyword found in a PHI entity type
+PHI_BREAKDOWN_KEYS = {
+    'NAME': 'names',
+    'PHONE': 'phone_numbers',
+    'ADDRESS': 'addresses',
+    'DATE': 'dates_of_birth',
+    'RECORD': 'medical_record_numbers',
+    'MRN': 'medical_record_numbers'
+}
+PHI_TYPE_PATTERN = re.compile('|'.join(PHI_BREAKDOWN_KEYS))
+
+# Entries kept per in-memory AWS service log; the dashboard shows the last 10
+SERVICE_LOG_LIMIT = 100
+
+# Seconds before MongoDB-backed patient totals are recounted, to pick up
+# writes made by other processes
+PATIENT_AGGREGATES_RESYNC = 60
+
+def normalize_phi_types(patient_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of patient data for storage, with upper-cased, interned PHI types"""
+    # The caller's dicts go back to the client as-is, so PHI items are copied
+    normalized = dict(patient_data)
+    phi_list = patient_data.get('phi_detected')
+    if isinstance(phi_list, list):
+        normalized['phi_detected'] = [
+            {**phi_item, 'Type': sys.intern(phi_item['Type'].upper())}
+            if isinstance(phi_item, dict) and isinstance(phi_item.get('Type'), str) else phi_item
+            for phi_item in phi_list
+        ]
+    return normalized
+
+class PatientAggregates:
+    """Running PHI, condition and medication totals over the stored patients"""
+    
+    def __init__(self):
+        # patient key -> that patient's (phi count, phi types, conditions, medications)
+        self.contributions = {}
+        self.total_phi = 0
+        self.total_conditions = 0
+        self.total_medications = 0
+        self.phi_types = Counter()
+        self.condition_counts = Counter()
+        self.medication_counts = Counter()
+    
+    @staticmethod
+    def contribution(patient: Dict[str, Any]):
+        """Count one patient document's PHI, conditions and medications, including nested patient_data"""
+        phi_count = 0
+        phi_types = Counter()
+        conditions = Counter()
+        medications = Counter()
+        for data in (patient, patient.get('patient_data')):
+            if not isinstance(data, dict):
+                continue
+            if isinstance(phi_list := data.get('phi_detected'), list):
+                phi_count += len(phi_list)
+                phi_types.update(item.get('Type', '') for item in phi_list if isinstance(item, dict))
+            if isinstance(patient_conditions := data.get('medical_conditions'), list):
+                conditions.update(patient_conditions)
+            if isinstance(patient_medications := data.get('medications'), list):
+                medications.update(patient_medications)
+        return phi_count, phi_types, conditions, medications
+    
+    def set_patient(self, key, patient: Dict[str, Any]):
+        """Replace one patient's share of the totals with its current document"""
+        old = self.contributions.pop(key, None)
+        if old is not None:
+            self.total_phi -= old[0]
+            self.total_conditions -= old[2].total()
+            self.total_medications -= old[3].total()
+            self.phi_types -= old[1]
+            self.condition_counts -= old[2]
+            self.medication_counts -= old[3]
+        
+        new = self.contribution(patient)
+        self.contributions[key] = new
+        self.total_phi += new[0]
+        self.total_conditions += new[2].total()
+        self.total_medications += new[3].total()
+        self.phi_types += new[1]
+        self.condition_counts += new[2]
+        self.medication_counts += new[3]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the totals in the dashboard's format"""
+        phi_breakdown = {'names': 0, 'phone_numbers': 0, 'addresses': 0, 'dates_of_birth': 0, 'medical_record_numbers': 0}
+        for phi_type, count in self.phi_types.items():
+            if match := PHI_TYPE_PATTERN.search(phi_type):
+                phi_breakdown[PHI_BREAKDOWN_KEYS[match.group()]] += count
+        
+        return {
+            'total_phi': self.total_phi,
+            'phi_types': list(self.phi_types),
+            'phi_breakdown': phi_breakdown,
+            'top_conditions': self.condition_counts.most_common(5),
+            'top_medications': self.medication_counts.most_common(5),
+            'total_conditions': self.total_conditions,
+            'total_medications': self.total_medications
+        }
+
+class RecordWriter:
+    """Background thread that writes queued processing records in batches"""
+    
+    def __init__(self, write_batch, max_batch_size=100):
+        self._write_batch = write_batch
+        self._max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+    
+    def submit(self, record: Dict[str, Any]) -> Future:
+        """Queue a record; the returned future resolves once its batch is written"""
+        future = Future()
+        self._ensure_thread()
+        self._queue.put((record, future))
+        return future
+    
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name='mongo-record-writer', daemon=True
+                    )
+                    self._thread.start()
+    
+    def _run(self):
+        while True:
+            # Records queued while the previous batch was being written join
+            # this one, so concurrent uploads share round trips without
+            # adding any wait when only one upload is in flight
+            batch = [self._queue.get()]
+            while len(batch) < self._max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                failures = self._write_batch([record for record, _ in batch]) or {}
+            except Exception as e:
+                # Nothing in the batch was written
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for index, (_, future) in enumerate(batch):
+                    if index in failures:
+                        future.set_exception(failures[index])
+                    else:
+                        future.set_result(True)
+
 class MongoDBStore:
     """MongoDB-based data store for tracking processing history and analytics"""
     
@@ -16,6 +185,23 @@ class MongoDBStore:
         self.processing_history = None
         self.patients = None
         self.analytics = None
+        self.record_writer = RecordWriter(self.write_records)
+        # Bumped after every write so readers can tell when cached views are stale
+        self.revision = 0
+        # Built from a full patient scan on first use, then kept up to date on write
+        self.patient_aggregates = None
+        self.patient_aggregates_synced = 0
+        self.patient_aggregates_lock = threading.Lock()
+        # Patients are always written with the full structure, so older
+        # documents only need to be checked once per process
+        self.patient_structure_ensured = False
+        # Recent AWS service activity for the dashboard, oldest entries dropped first
+        self.api_gateway_logs = deque(maxlen=SERVICE_LOG_LIMIT)
+        self.s3_logs = deque(maxlen=SERVICE_LOG_LIMIT)
+        self.eventbridge_logs = deque(maxlen=SERVICE_LOG_LIMIT)
+        self.step_functions_logs = deque(maxlen=SERVICE_LOG_LIMIT)
+        self.cloudwatch_alarms = deque(maxlen=SERVICE_LOG_LIMIT)
+        self.secrets_manager_logs = deque(maxlen=SERVICE_LOG_LIMIT)
         self.connect()
     
     def connect(self):
@@ -114,8 +300,8 @@ class MongoDBStore:
             'last_updated': datetime.now().isoformat()
         }
     
-    def add_processing_record(self, record: Dict[str, Any]):
-        """Add a new processing record"""
+    def new_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a processing record for storage, with a fresh id and timestamp"""
         # Create a copy of the record to avoid modifying the original
         record_copy = record.copy()
         record_copy['id'] = str(uuid.uuid4())
@@ -125,23 +311,22 @@ class MongoDBStore:
         if '_id' in record_copy:
             del record_copy['_id']
         
+        return record_copy
+    
+    def add_processing_record(self, record: Dict[str, Any]):
+        """Add a new processing record"""
+        record_copy = self.new_record(record)
+        
         try:
             if self.client:  # MongoDB mode
-                # Add to processing history
-                result = self.processing_history.insert_one(record_copy)
-                
-                # Update analytics
-                self.update_analytics(record_copy)
-                
-                # Add patient data if available
-                if 'patient_data' in record_copy:
-                    self.add_patient_data(record_copy['patient_data'])
+                # Written in a batch with any other records queued meanwhile
+                self.record_writer.submit(record_copy).result()
                 
                 logger.info(f"✅ Processing record added to MongoDB: {record_copy['id']}")
                 return record_copy['id']
             else:  # Fallback mode
-                self.processing_history.append(record_copy)
-                self.update_analytics(record_copy)
+                self.processing_history.append(project_record(record_copy))
+                self.update_analytics([record_copy])
                 if 'patient_data' in record_copy:
                     self.add_patient_data(record_copy['patient_data'])
                 logger.info(f"✅ Processing record added to fallback storage: {record_copy['id']}")
@@ -150,6 +335,142 @@ class MongoDBStore:
         except Exception as e:
             logger.error(f"❌ Failed to add processing record: {e}")
             return None
+        finally:
+            self.mark_changed()
+    
+    def add_processing_records(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Add several processing records at once; returns their ids"""
+        record_copies = [self.new_record(record) for record in records]
+        
+        try:
+            if self.client:  # MongoDB mode
+                # Queued together, so the writer stores them in as few
+                # batches (one insert_many each) as its batch size allows
+                futures = [self.record_writer.submit(record_copy) for record_copy in record_copies]
+                for future in futures:
+                    future.result()
+            else:  # Fallback mode
+                self.processing_history.extend(project_record(record_copy) for record_copy in record_copies)
+                self.update_analytics(record_copies)
+                for record_copy in record_copies:
+                    if 'patient_data' in record_copy:
+                        self.add_patient_data(record_copy['patient_data'])
+            
+            logger.info(f"✅ {len(record_copies)} processing records added")
+            return [record_copy['id'] for record_copy in record_copies]
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to add processing records: {e}")
+            return []
+        finally:
+            self.mark_changed()
+    
+    def write_records(self, records: List[Dict[str, Any]]) -> Dict[int, Exception]:
+        """Write a batch of processing records; returns errors of records not inserted, by batch index"""
+        from pymongo.errors import BulkWriteError, WriteError
+        
+        # Add to processing history; an unordered insert still writes the
+        # records around a rejected one, so only those records fail
+        failures = {}
+        try:
+            self.processing_history.insert_many([project_record(record) for record in records], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                failures[error['index']] = WriteError(error.get('errmsg'), error.get('code'), error)
+            logger.error(f"❌ Failed to add {len(failures)} of {len(records)} processing records: {e}")
+            records = [record for index, record in enumerate(records) if index not in failures]
+        
+        # Update analytics from the full records
+        self.update_analytics(records)
+        
+        # Add patient data if available
+        try:
+            patient_ops = []
+            for record in records:
+                if 'patient_data' in record:
+                    patient_ops.extend(self.patient_update_ops(record['patient_data']))
+            if patient_ops:
+                self.patients.bulk_write(patient_ops)
+                self.refresh_patient_aggregates(
+                    [record['patient_data'] for record in records if 'patient_data' in record]
+                )
+        except Exception as e:
+            logger.error(f"❌ Failed to add patient data: {e}")
+        
+        return failures
+    
+    def patient_update_ops(self, patient_data: Dict[str, Any]) -> List[Any]:
+        """Build the MongoDB updates that add or update one patient"""
+        from pymongo import UpdateOne
+        
+        patient_data = normalize_phi_types(patient_data)
+        patient_id = patient_data.get('mrn', patient_data.get('id', 'unknown'))
+        
+        # Use upsert to create or update
+        ops = [UpdateOne(
+            {'mrn': patient_id},
+            {
+                '$set': {
+                    'last_processed': datetime.now().isoformat(),
+                    'patient_data': patient_data
+                },
+                '$inc': {'processing_count': 1},
+                '$setOnInsert': {
+                    'first_seen': datetime.now().isoformat(),
+                    'phi_detected': [],
+                    'medical_conditions': [],
+                    'medications': []
+                }
+            },
+            upsert=True
+        )]
+        
+        # Update arrays if new data is available
+        if 'phi_detected' in patient_data:
+            phi_list = patient_data['phi_detected']
+            if isinstance(phi_list, list):
+                ops.append(UpdateOne(
+                    {'mrn': patient_id},
+                    {'$addToSet': {'phi_detected': {'$each': phi_list}}}
+                ))
+        
+        if 'medical_conditions' in patient_data:
+            conditions = patient_data['medical_conditions']
+            if isinstance(conditions, list):
+                condition_names = []
+                for condition in conditions:
+                    if isinstance(condition, dict):
+                        name = condition.get('name', condition.get('display_name', str(condition)))
+                        if name:
+                            condition_names.append(name)
+                    else:
+                        condition_names.append(str(condition))
+                
+                if condition_names:
+                    ops.append(UpdateOne(
+                        {'mrn': patient_id},
+                        {'$addToSet': {'medical_conditions': {'$each': condition_names}}}
+                    ))
+        
+        if 'medications' in patient_data:
+            medications = patient_data['medications']
+            if isinstance(medications, list):
+                med_names = []
+                for medication in medications:
+                    if isinstance(medication, dict):
+                        name = medication.get('name', str(medication))
+                        if name:
+                            med_names.append(name)
+                    else:
+                        med_names.append(str(medication))
+                
+                if med_names:
+                    ops.append(UpdateOne(
+                        {'mrn': patient_id},
+                        {'$addToSet': {'medications': {'$each': med_names}}}
+                    ))
+        
+        return ops
     
     def add_patient_data(self, patient_data: Dict[str, Any]):
         """Add or update patient data"""
@@ -157,73 +478,12 @@ class MongoDBStore:
             patient_id = patient_data.get('mrn', patient_data.get('id', 'unknown'))
             
             if self.client:  # MongoDB mode
-                # Use upsert to create or update
-                update_data = {
-                    '$set': {
-                        'last_processed': datetime.now().isoformat(),
-                        'patient_data': patient_data
-                    },
-                    '$inc': {'processing_count': 1},
-                    '$setOnInsert': {
-                        'first_seen': datetime.now().isoformat(),
-                        'phi_detected': [],
-                        'medical_conditions': [],
-                        'medications': []
-                    }
-                }
-                
-                self.patients.update_one(
-                    {'mrn': patient_id},
-                    update_data,
-                    upsert=True
-                )
-                
-                # Update arrays if new data is available
-                if 'phi_detected' in patient_data:
-                    phi_list = patient_data['phi_detected']
-                    if isinstance(phi_list, list):
-                        self.patients.update_one(
-                            {'mrn': patient_id},
-                            {'$addToSet': {'phi_detected': {'$each': phi_list}}}
-                        )
-                
-                if 'medical_conditions' in patient_data:
-                    conditions = patient_data['medical_conditions']
-                    if isinstance(conditions, list):
-                        condition_names = []
-                        for condition in conditions:
-                            if isinstance(condition, dict):
-                                name = condition.get('name', condition.get('display_name', str(condition)))
-                                if name:
-                                    condition_names.append(name)
-                            else:
-                                condition_names.append(str(condition))
-                        
-                        if condition_names:
-                            self.patients.update_one(
-                                {'mrn': patient_id},
-                                {'$addToSet': {'medical_conditions': {'$each': condition_names}}}
-                            )
-                
-                if 'medications' in patient_data:
-                    medications = patient_data['medications']
-                    if isinstance(medications, list):
-                        med_names = []
-                        for medication in medications:
-                            if isinstance(medication, dict):
-                                name = medication.get('name', str(medication))
-                                if name:
-                                    med_names.append(name)
-                            else:
-                                med_names.append(str(medication))
-                        
-                        if med_names:
-                            self.patients.update_one(
-                                {'mrn': patient_id},
-                                {'$addToSet': {'medications': {'$each': med_names}}}
-                            )
+                # Ordered, so the upsert runs before the array updates
+                self.patients.bulk_write(self.patient_update_ops(patient_data))
+                self.refresh_patient_aggregates([patient_data])
             
             else:  # Fallback mode
+                patient_data = normalize_phi_types(patient_data)
                 if patient_id not in self.patients:
                     self.patients[patient_id] = {
                         'first_seen': datetime.now().isoformat(),
@@ -270,12 +530,70 @@ class MongoDBStore:
                                 med_str = str(medication)
                                 if med_str and med_str not in self.patients[patient_id]['medications']:
                                     self.patients[patient_id]['medications'].append(med_str)
+                
+                self.refresh_patient_aggregates([patient_data])
             
         except Exception as e:
             logger.error(f"❌ Failed to add patient data: {e}")
+        finally:
+            self.mark_changed()
+    
+    def refresh_patient_aggregates(self, patient_records: List[Dict[str, Any]]):
+        """Update the running patient totals for patients that were just written"""
+        # Until the first read they are built from a full scan instead
+        if self.patient_aggregates is None:
+            return
+        
+        patient_ids = {record.get('mrn', record.get('id', 'unknown')) for record in patient_records}
+        # The stored documents are read under the lock too, so of two writers to
+        # the same patient, the one reading the newer document applies it last
+        with self.patient_aggregates_lock:
+            if self.patient_aggregates is None:
+                return
+            if self.client:  # MongoDB mode
+                patients = {
+                    patient['mrn']: patient
+                    for patient in self.patients.find({'mrn': {'$in': list(patient_ids)}})
+                }
+            else:  # Fallback mode
+                patients = {patient_id: self.patients[patient_id] for patient_id in patient_ids if patient_id in self.patients}
+            
+            for patient_id, patient in patients.items():
+                self.patient_aggregates.set_patient(patient_id, patient)
+    
+    def get_patient_aggregates(self) -> Dict[str, Any]:
+        """Get PHI, condition and medication totals across all patients"""
+        with self.patient_aggregates_lock:
+            # MongoDB may also be written by other processes, so recount periodically
+            stale = self.client and time.monotonic() - self.patient_aggregates_synced > PATIENT_AGGREGATES_RESYNC
+            if self.patient_aggregates is None or stale:
+                aggregates = PatientAggregates()
+                try:
+                    # Read directly, as get_all_patients() hides a failed read
+                    # behind an empty result
+                    if self.client:  # MongoDB mode
+                        patient_items = (
+                            (patient.get('mrn', index), patient)
+                            for index, patient in enumerate(self.patients.find())
+                        )
+                    else:  # Fallback mode
+                        patient_items = list(self.patients.items())
+                    for patient_id, patient in patient_items:
+                        if isinstance(patient, dict):
+                            aggregates.set_patient(patient_id, patient)
+                except Exception as e:
+                    # Keep the previous totals and sync time, so the next call retries
+                    logger.error(f"❌ Failed to recount patient aggregates: {e}")
+                    if self.patient_aggregates is None:
+                        return PatientAggregates().snapshot()
+                else:
+                    self.patient_aggregates = aggregates
+                    self.patient_aggregates_synced = time.monotonic()
+            
+            return self.patient_aggregates.snapshot()
     
-    def update_analytics(self, record: Dict[str, Any]):
-        """Update analytics based on processing record"""
+    def update_analytics(self, records: List[Dict[str, Any]]):
+        """Update analytics based on a batch of processing records"""
         try:
             if self.client:  # MongoDB mode
                 # Get current analytics
@@ -283,100 +601,66 @@ class MongoDBStore:
                 if not current_analytics:
                     current_analytics = self.get_initial_analytics()
                 
-                # Update basic counts
-                current_analytics['total_documents'] += 1
-                
-                if record.get('success', False):
-                    current_analytics['successful_conversions'] += 1
-                else:
-                    current_analytics['failed_conversions'] += 1
-                
-                # Update processing time average
-                processing_time = record.get('processing_time', 0)
-                if processing_time > 0:
-                    current_avg = current_analytics['processing_time_avg']
-                    total_processed = current_analytics['successful_conversions'] + current_analytics['failed_conversions']
-                    current_analytics['processing_time_avg'] = ((current_avg * (total_processed - 1)) + processing_time) / total_processed
-                
-                # Update entity extraction counts
-                comprehend_results = record.get('comprehend_results')
-                if comprehend_results is not None:
-                    entities = comprehend_results.get('entities', [])
-                    phi = comprehend_results.get('phi', [])
-                    
-                    for entity in entities:
-                        category = entity.get('Category', '').lower()
-                        if 'condition' in category:
-                            current_analytics['entity_extraction']['medical_conditions'] += 1
-                        elif 'medication' in category:
-                            current_analytics['entity_extraction']['medications'] += 1
-                        elif 'procedure' in category:
-                            current_analytics['entity_extraction']['procedures'] += 1
-                        elif 'test' in category or 'lab' in category:
-                            current_analytics['entity_extraction']['lab_results'] += 1
-                    
-                    current_analytics['entity_extraction']['phi_detected'] += len(phi)
-                
-                # Update FHIR resource counts
-                fhir_resources = record.get('fhir_resources', [])
-                if fhir_resources:
-                    for resource in fhir_resources:
-                        resource_type = resource.get('resourceType', '').lower()
-                        if resource_type in current_analytics['fhir_resources']:
-                            current_analytics['fhir_resources'][resource_type] += 1
+                for record in records:
+                    self.apply_record_to_analytics(current_analytics, record)
                 
                 # Update last updated timestamp
                 current_analytics['last_updated'] = datetime.now().isoformat()
                 
-                # Save updated analytics
+                # Save updated analytics, once for the whole batch
                 self.analytics.replace_one({}, current_analytics, upsert=True)
             
             else:  # Fallback mode
-                # Update basic counts
-                self.analytics['total_documents'] += 1
-                
-                if record.get('success', False):
-                    self.analytics['successful_conversions'] += 1
-                else:
-                    self.analytics['failed_conversions'] += 1
-                
-                # Update processing time average
-                processing_time = record.get('processing_time', 0)
-                if processing_time > 0:
-                    current_avg = self.analytics['processing_time_avg']
-                    total_processed = self.analytics['successful_conversions'] + self.analytics['failed_conversions']
-                    self.analytics['processing_time_avg'] = ((current_avg * (total_processed - 1)) + processing_time) / total_processed
-                
-                # Update entity extraction counts
-                comprehend_results = record.get('comprehend_results')
-                if comprehend_results is not None:
-                    entities = comprehend_results.get('entities', [])
-                    phi = comprehend_results.get('phi', [])
-                    
-                    for entity in entities:
-                        category = entity.get('Category', '').lower()
-                        if 'condition' in category:
-                            self.analytics['entity_extraction']['medical_conditions'] += 1
-                        elif 'medication' in category:
-                            self.analytics['entity_extraction']['medications'] += 1
-                        elif 'procedure' in category:
-                            self.analytics['entity_extraction']['procedures'] += 1
-                        elif 'test' in category or 'lab' in category:
-                            self.analytics['entity_extraction']['lab_results'] += 1
-                    
-                    self.analytics['entity_extraction']['phi_detected'] += len(phi)
-                
-                # Update FHIR resource counts
-                fhir_resources = record.get('fhir_resources', [])
-                if fhir_resources:
-                    for resource in fhir_resources:
-                        resource_type = resource.get('resourceType', '').lower()
-                        if resource_type in self.analytics['fhir_resources']:
-                            self.analytics['fhir_resources'][resource_type] += 1
+                for record in records:
+                    self.apply_record_to_analytics(self.analytics, record)
             
         except Exception as e:
             logger.error(f"❌ Failed to update analytics: {e}")
     
+    def apply_record_to_analytics(self, analytics: Dict[str, Any], record: Dict[str, Any]):
+        """Add one processing record's counts to an analytics document"""
+        # Update basic counts
+        analytics['total_documents'] += 1
+        
+        if record.get('success', False):
+            analytics['successful_conversions'] += 1
+        else:
+            analytics['failed_conversions'] += 1
+        
+        # Update processing time average
+        processing_time = record.get('processing_time', 0)
+        if processing_time > 0:
+            current_avg = analytics['processing_time_avg']
+            total_processed = analytics['successful_conversions'] + analytics['failed_conversions']
+            analytics['processing_time_avg'] = ((current_avg * (total_processed - 1)) + processing_time) / total_processed
+        
+        # Update entity extraction counts
+        comprehend_results = record.get('comprehend_results')
+        if comprehend_results is not None:
+            entities = comprehend_results.get('entities', [])
+            phi = comprehend_results.get('phi', [])
+            
+            for entity in entities:
+                category = entity.get('Category', '').lower()
+                if 'condition' in category:
+                    analytics['entity_extraction']['medical_conditions'] += 1
+                elif 'medication' in category:
+                    analytics['entity_extraction']['medications'] += 1
+                elif 'procedure' in category:
+                    analytics['entity_extraction']['procedures'] += 1
+                elif 'test' in category or 'lab' in category:
+                    analytics['entity_extraction']['lab_results'] += 1
+            
+            analytics['entity_extraction']['phi_detected'] += len(phi)
+        
+        # Update FHIR resource counts
+        fhir_resources = record.get('fhir_resources', [])
+        if fhir_resources:
+            for resource in fhir_resources:
+                resource_type = resource.get('resourceType', '').lower()
+                if resource_type in analytics['fhir_resources']:
+                    analytics['fhir_resources'][resource_type] += 1
+    
     def get_analytics(self) -> Dict[str, Any]:
         """Get analytics data"""
         try:
@@ -526,6 +810,8 @@ class MongoDBStore:
                         patient_data['medications'] = []
                 
                 logger.info(f"✅ Patient structure ensured for fallback storage")
+            
+            self.patient_structure_ensured = True
                 
         except Exception as e:
             logger.error(f"❌ Failed to ensure patient structure: {e}")
@@ -542,6 +828,17 @@ class MongoDBStore:
             logger.error(f"❌ Failed to get all patients: {e}")
             return {'patients': {}}
     
+    def count_patients(self) -> int:
+        """Count patients without loading them (collection metadata in MongoDB mode)"""
+        try:
+            if self.client:  # MongoDB mode
+                return self.patients.estimated_document_count()
+            else:  # Fallback mode
+                return len(self.patients)
+        except Exception as e:
+            logger.error(f"❌ Failed to count patients: {e}")
+            return 0
+    
     def get_medical_insights(self) -> Dict[str, Any]:
         """Get medical insights from analytics"""
         try:
@@ -576,6 +873,10 @@ class MongoDBStore:
             }
         }
     
+    def mark_changed(self):
+        """Record that the stored data changed"""
+        self.revision += 1
+    
     def reset_database(self):
         """Reset all data"""
         try:
@@ -592,6 +893,10 @@ class MongoDBStore:
                 logger.info("✅ Fallback storage reset successfully")
         except Exception as e:
             logger.error(f"❌ Failed to reset database: {e}")
+        finally:
+            with self.patient_aggregates_lock:
+                self.patient_aggregates = None
+            self.mark_changed()
 
     def convert_objectid_to_str(self, obj):
         """Convert ObjectId to string for JSON serialization"""